@@ -3,10 +3,22 @@
 import processRoster
 import sys
 
-myroster = processRoster.Roster()
+if __name__ == '__main__':		#Required for processAll() to start its worker processes
+	if '--watch' in sys.argv:
+		#Keep running, checking the roster every watch.WATCHINTERVAL seconds
+		#The credentials are asked for once here, rather than at every check
+		import watch
+		from getpass import getpass
+		user = input("Please enter username: ")
+		pwd = getpass("Please enter password for '" + user + "': ")
+		watch.Watcher(processRoster.Roster({'watch':True,'user':user,'password':pwd})).run()
+	elif processRoster.SOURCES:
+		processRoster.processAll()
+	else:
+		myroster = processRoster.Roster()
 
-myroster.process()
+		myroster.process()
 
-#Force quit
-#To ensure kill during automation
-sys.exit()
\ No newline at end of file
+	#Force quit
+	#To ensure kill during automation
+	sys.exit()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+
+import argparse
+import datetime
+import json
+import os
+import os.path
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+
+import dates
+import diff
+import render
+import roster
+import rowindex
+import shifts
+import synthetic
+
+#########
+# GLOBALS
+#########
+BENCHSTAFF = 100		#Default number of staff in the synthetic roster
+BENCHDAYS = 365			#Default number of days in the synthetic roster
+BENCHREPEAT = 5			#Default number of times each benchmark is run
+BENCHCHANGES = 0.02		#Share of shifts changed between the two versions that are compared
+BENCHRESULTS = './log/bench.jsonl'	#Results of each run are appended here
+BENCHTOLERANCE = 1.25		#A benchmark this many times slower than the last run is reported
+
+#//////////////////////////////////////////////////////////////////
+# CLASS: Bench
+# Runs each benchmark against a synthetic roster of a given size
+# The synthetic files are written once to a temporary folder and removed by close()
+#
+# Parameter(s):
+#	staff: Number of staff in the synthetic roster
+#	-- Datatype: Integer
+#	days: Number of days in the synthetic roster
+#	-- Datatype: Integer
+#	mix: Optional. Relative weight of each shift code, as per synthetic.SHIFTMIX
+#	-- Datatype: Dictionary of {'Shift':weight}
+#	seed: Optional. Seed of the synthetic roster
+#	-- Datatype: Integer
+#//////////////////////////////////////////////////////////////////
+class Bench:
+	def __init__(self,staff=BENCHSTAFF,days=BENCHDAYS,mix=None,seed=0):
+		self.__staff = staff
+		self.__days = days
+		self.__folder = tempfile.mkdtemp(prefix='bench')
+		self.__previous = synthetic.generate(staff,days,mix,seed=seed)
+		self.__current = synthetic.mutate(self.__previous,BENCHCHANGES,mix,seed=seed + 1)
+		self.__csvfile = os.path.join(self.__folder,'roster.csv')
+		self.__xlsxfile = os.path.join(self.__folder,'roster.xlsx')
+		synthetic.writeCSV(self.__previous,self.__csvfile)
+		synthetic.writeWorkbook(self.__previous,self.__xlsxfile)
+		self.__start = dates.excelDate(self.__previous[1][0])
+		self.__finish = dates.excelDate(self.__previous[-1][0])
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self,*args):
+		self.close()
+
+#//////////////////////////////////////////////////////////////////
+# PUBLIC FUNCTIONS
+# Callable by program to run the benchmarks
+#//////////////////////////////////////////////////////////////////
+	def run(self,repeat=BENCHREPEAT):
+		return self.__run(repeat)
+
+	def close(self):
+		shutil.rmtree(self.__folder,ignore_errors=True)
+
+#//////////////////////////////////////////////////////////////////
+# CORE FUNCTIONS
+# Used to time the benchmarks
+#//////////////////////////////////////////////////////////////////
+	# FUNCTION: self.__run
+	# Times every benchmark
+	#
+	# Parameter(s):
+	#	repeat: Number of times to run each benchmark
+	#	-- Datatype: Integer
+	# Returns:
+	#	Dictionary of {'benchmark':{'best':seconds,'median':seconds}}
+	#//////////////////////////////////////////////////////////
+	def __run(self,repeat):
+		benchmarks = [('load_days',self.__loadDays),
+			('load_matrix',self.__loadMatrix),
+			('load_workbook',self.__loadWorkbook),
+			('load_window',self.__loadWindow),
+			('show_day',self.__showDay),
+			('show_period',self.__showPeriod),
+			('show_member_period',self.__showMemberPeriod),
+			('shift',self.__shift),
+			('diff',self.__diff),
+			('render',self.__render)]
+		results = {}
+		for name,benchmark in benchmarks:
+			times = self.__time(benchmark,repeat)
+			results[name] = {'best':min(times),'median':statistics.median(times)}
+		return results
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__time
+	# Runs a benchmark repeatedly, returning the seconds taken by each run
+	# Each benchmark returns the function to time, so its setup is not timed
+	#//////////////////////////////////////////////////////////
+	def __time(self,benchmark,repeat):
+		times = []
+		for n in range(0,repeat):
+			timed = benchmark()
+			begin = time.perf_counter()
+			timed()
+			times.append(time.perf_counter() - begin)
+		return times
+
+#//////////////////////////////////////////////////////////////////
+# SECONDARY FUNCTIONS
+# The benchmarks. Each sets up its inputs and returns the function to time
+#//////////////////////////////////////////////////////////////////
+	def __loadDays(self):
+		return lambda: roster.Roster(self.__csvfile,storage='days')
+
+	def __loadMatrix(self):
+		return lambda: roster.Roster(self.__csvfile,storage='matrix')
+
+	def __loadWorkbook(self):
+		return lambda: roster.Roster.fromWorkbook(self.__xlsxfile,synthetic.WORKSHEET)
+
+	def __loadWindow(self):
+		rowindex.write(self.__csvfile)
+		finish = self.__start + datetime.timedelta(days=13)
+		return lambda: roster.Roster.fromIndex(self.__csvfile,self.__start,finish,storage='matrix')
+
+	def __showDay(self):
+		myroster = roster.Roster(self.__csvfile)
+		period = [dates.excelDate(row[0]) for row in self.__previous[1:]]
+		return lambda: [myroster.showDay(day) for day in period]
+
+	def __showPeriod(self):
+		myroster = roster.Roster(self.__csvfile)
+		return lambda: myroster.showPeriod(self.__start,self.__finish)
+
+	def __showMemberPeriod(self):
+		myroster = roster.Roster(self.__csvfile)
+		staff = self.__previous[0][1:]
+		return lambda: [myroster.showMemberPeriod(name,self.__start,self.__finish) for name in staff]
+
+	def __shift(self):
+		shifts.clearShifts()
+		cells = [(dates.excelDate(row[0]),shift) for row in self.__previous[1:] for shift in row[1:]]
+		return lambda: [shifts.Shift(day,shift).hours() for day,shift in cells]
+
+	def __diff(self):
+		previous = roster.Roster(self.__csvfile)
+		current = self.__roster(self.__current)
+		return lambda: diff.Diff(previous,current,self.__start,self.__finish)
+
+	def __render(self):
+		changes = diff.Diff(roster.Roster(self.__csvfile),self.__roster(self.__current),self.__start,self.__finish)
+		batch = [(name,changes.showCurrent(name),changes.showPrevious(name)) for name in self.__previous[0][1:] if changes.changed(name)]
+		return lambda: render.Template('http://localhost/roster.xlsx').renderAll(batch)
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__roster
+	# Returns a Roster of a synthetic array, via a CSV in the temporary folder
+	#//////////////////////////////////////////////////////////
+	def __roster(self,arr):
+		csvfile = os.path.join(self.__folder,'current.csv')
+		synthetic.writeCSV(arr,csvfile)
+		return roster.Roster(csvfile)
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: save
+# Appends the results of a run to the results file, as one JSON line
+#
+# Parameter(s):
+#	results: Results returned from Bench.run()
+#	-- Datatype: Dictionary
+#	staff,days,repeat: Size of the roster and number of repeats of the run
+#	-- Datatype: Integer
+#	path: Optional. File location of the results
+#	-- Datatype: String
+# Returns:
+#	Dictionary of the saved run
+#//////////////////////////////////////////////////////////////////
+def save(results,staff,days,repeat,path=BENCHRESULTS):
+	run = {'time':datetime.datetime.now().isoformat(timespec='seconds'),
+		'python':platform.python_version(),
+		'staff':staff,
+		'days':days,
+		'repeat':repeat,
+		'results':results}
+	folder = os.path.dirname(path)
+	if folder:
+		os.makedirs(folder,exist_ok=True)
+	with open(path,'a') as saved:
+		saved.write(json.dumps(run,sort_keys=True) + "\n")
+	return run
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: lastRun
+# Returns the most recent saved run of the same roster size
+#
+# Parameter(s):
+#	staff,days: Size of the roster
+#	-- Datatype: Integer
+#	path: Optional. File location of the results
+#	-- Datatype: String
+# Returns:
+#	Dictionary of the run, as per save(), or None if there is no such run
+#//////////////////////////////////////////////////////////////////
+def lastRun(staff,days,path=BENCHRESULTS):
+	last = None
+	try:
+		with open(path,'r') as saved:
+			for line in saved:
+				try:
+					run = json.loads(line)
+				except ValueError:
+					continue
+				if run.get('staff') == staff and run.get('days') == days:
+					last = run
+	except (IOError,OSError):
+		pass
+	return last
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: compare
+# Compares the best time of each benchmark against a previous run
+#
+# Parameter(s):
+#	results: Results returned from Bench.run()
+#	-- Datatype: Dictionary
+#	previous: Run returned from lastRun()
+#	-- Datatype: Dictionary
+# Returns:
+#	Dictionary of {'benchmark':ratio}, where a ratio above 1 is slower than before
+#//////////////////////////////////////////////////////////////////
+def compare(results,previous):
+	ratios = {}
+	for name,result in results.items():
+		before = previous['results'].get(name)
+		if before and before['best'] > 0:
+			ratios[name] = result['best'] / before['best']
+	return ratios
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description="Benchmarks the roster library against a synthetic roster")
+	parser.add_argument('--staff',type=int,default=BENCHSTAFF)
+	parser.add_argument('--days',type=int,default=BENCHDAYS)
+	parser.add_argument('--repeat',type=int,default=BENCHREPEAT)
+	parser.add_argument('--results',default=BENCHRESULTS,help="JSON lines file to compare against and append to")
+	args = parser.parse_args()
+
+	with Bench(args.staff,args.days) as bench:
+		results = bench.run(args.repeat)
+	previous = lastRun(args.staff,args.days,args.results)
+	ratios = compare(results,previous) if previous else {}
+	for name,result in results.items():
+		line = "%-20s best %10.6fs  median %10.6fs" % (name,result['best'],result['median'])
+		if name in ratios:
+			line += "  x%.2f" % ratios[name]
+			if ratios[name] > BENCHTOLERANCE:
+				line += "  SLOWER"
+		print(line)
+	save(results,args.staff,args.days,args.repeat,args.results)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+import os.path
+import subprocess
+import sys
+
+#########
+# GLOBALS
+#########
+IMPORTBUDGET = 100000	#Microseconds allowed to import processRoster, as reported by -X importtime
+DEFERRED = ['requests','xlsx','smtplib','email.mime','hashlib','csv','concurrent.futures','roster','diff','render','notify']
+# DEFERRED - Modules that must not be imported until the stage that needs them
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: importTimes
+# Imports a module in a fresh interpreter with '-X importtime'
+# Runs from this folder, so the check works wherever it is started from
+#
+# Parameter(s):
+#	module: Name of the module to import
+#	-- Datatype: String
+# Returns:
+#	Dictionary of {'module':cumulative microseconds} for every module imported
+#//////////////////////////////////////////////////////////////////
+def importTimes(module):
+	result = subprocess.run([sys.executable,'-X','importtime','-c','import ' + module],
+		stderr=subprocess.PIPE,universal_newlines=True,cwd=os.path.dirname(os.path.abspath(__file__)))
+	times = {}
+	for line in result.stderr.splitlines():
+		if not line.startswith('import time:') or '|' not in line:
+			continue
+		parts = line[len('import time:'):].split('|')
+		try:
+			times[parts[2].strip()] = int(parts[1])
+		except ValueError:		#Column headings
+			continue
+	if result.returncode != 0 or module not in times:
+		raise Exception("Unable to import " + module + ":\n" + result.stderr)
+	return times
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: checkStartup
+# Checks that importing a module stays within budget and defers heavy imports
+#
+# Parameter(s):
+#	module: Name of the module to check
+#	-- Datatype: String
+#	budget: Maximum cumulative import time in microseconds
+#	-- Datatype: Integer
+#	deferred: Modules that must not be imported along with the module
+#	-- Datatype: Array of Strings
+# Returns:
+#	Array of failure messages, empty if within budget
+#//////////////////////////////////////////////////////////////////
+def checkStartup(module='processRoster',budget=IMPORTBUDGET,deferred=DEFERRED):
+	times = importTimes(module)
+	failures = []
+	if times[module] > budget:
+		failures.append("Importing {0} took {1}us, over the budget of {2}us".format(module,times[module],budget))
+	for name in times:
+		for heavy in deferred:
+			if name == heavy or name.startswith(heavy + '.'):
+				failures.append("Importing {0} also imported {1}".format(module,name))
+	return failures
+
+if __name__ == '__main__':
+	failures = checkStartup()
+	for failure in failures:
+		print(failure)
+	if not failures:
+		print("processRoster imported within " + str(IMPORTBUDGET) + "us without any deferred modules")
+	sys.exit(1 if failures else 0)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+
+from bisect import bisect_left, bisect_right
+import datetime
+
+#//////////////////////////////////////////////////////////////////
+# CLASS: Coverage
+# An index of who is working each shift on each day of a roster
+# Holds {shift name: set of staff} per date, built in one pass over the roster,
+# so headcounts and coverage over a range are lookups rather than rebuilding
+# every day's staff
+# Blank cells are not indexed
+#
+# Parameter(s):
+#	store: Storage engine of the roster to index
+#	-- Datatype: day.Days or matrix.Matrix Object
+#//////////////////////////////////////////////////////////////////
+class Coverage:
+	def __init__(self,store):
+		self.__ordinals = []	#Sorted date ordinal of each day
+		self.__days = []		#{'Shift':set(staff)} for each ordinal
+		self.__build(store)
+
+#//////////////////////////////////////////////////////////////////
+# PUBLIC FUNCTIONS
+# Callable by the Roster class to query and maintain the index
+#//////////////////////////////////////////////////////////////////
+	def onShift(self,xdate,xshift):
+		return set(self.__getDay(xdate).get(xshift,()))
+
+	def headcount(self,xdate,xshift):
+		return len(self.__getDay(xdate).get(xshift,()))
+
+	def shifts(self,xdate):
+		return self.__headcounts(self.__getDay(xdate))
+
+	def period(self,xstart,xfinish):
+		lo = bisect_left(self.__ordinals,xstart.toordinal())
+		hi = bisect_right(self.__ordinals,xfinish.toordinal(),lo)
+		return [(datetime.date.fromordinal(self.__ordinals[n]),self.__headcounts(self.__days[n])) for n in range(lo,hi)]
+
+	def add(self,xdate,xstaff,xshift):
+		self.__add(self.__getDay(xdate),xstaff,xshift)
+
+	def remove(self,xdate,xstaff,xshift):
+		self.__remove(self.__getDay(xdate),xstaff,xshift)
+
+	def addMember(self,xstaff,xdefault):
+		for day in self.__days:
+			self.__add(day,xstaff,xdefault)
+
+	def removeMember(self,xstaff):
+		for day in self.__days:
+			for shift in list(day):
+				self.__remove(day,xstaff,shift)
+
+#//////////////////////////////////////////////////////////////////
+# CORE FUNCTIONS
+# Used to build and address the index
+#//////////////////////////////////////////////////////////////////
+	# FUNCTION: self.__build
+	# Indexes every day of a storage engine, reading it as one table
+	#//////////////////////////////////////////////////////////
+	def __build(self,store):
+		period = store.dates()
+		if not period:
+			return
+		staff = store.staff()
+		period,rows = store.table(staff,period[0],period[-1])
+		for day,row in zip(period,rows):
+			shifts = {}
+			for n in range(0,len(row)):
+				if row[n]:		#Skips blank (matrix) and missing (days) cells
+					shifts.setdefault(row[n],set()).add(staff[n])
+			self.__ordinals.append(day.toordinal())
+			self.__days.append(shifts)
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__getDay
+	# Returns the {'Shift':set(staff)} of a date. Raises KeyError if it is not held
+	#//////////////////////////////////////////////////////////
+	def __getDay(self,xdate):
+		ordinal = xdate.toordinal()
+		n = bisect_left(self.__ordinals,ordinal)
+		if n == len(self.__ordinals) or self.__ordinals[n] != ordinal:
+			raise KeyError(xdate)
+		return self.__days[n]
+
+#//////////////////////////////////////////////////////////////////
+# SECONDARY FUNCTIONS
+# Called by the public functions to return and manipulate entries
+#//////////////////////////////////////////////////////////////////
+	# FUNCTION: self.__headcounts
+	# Returns the number of staff on each shift of a day
+	#
+	# Parameter(s):
+	#	day: Entry of the index for one date
+	#	-- Datatype: Dictionary of {'Shift':set(staff)}
+	# Returns:
+	#	Dictionary of {'Shift':headcount}
+	#//////////////////////////////////////////////////////////
+	def __headcounts(self,day):
+		return dict((shift,len(staff)) for shift,staff in day.items())
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__add
+	# Adds a staff member to a shift of a day
+	#//////////////////////////////////////////////////////////
+	def __add(self,day,xstaff,xshift):
+		if xshift:
+			day.setdefault(xshift,set()).add(xstaff)
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__remove
+	# Removes a staff member from a shift of a day, dropping the shift once empty
+	#//////////////////////////////////////////////////////////
+	def __remove(self,day,xstaff,xshift):
+		staff = day.get(xshift)
+		if staff is None:
+			return
+		staff.discard(xstaff)
+		if not staff:
+			del day[xshift]
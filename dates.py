@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+
+import datetime
+from functools import lru_cache
+import re
+
+#########
+# GLOBALS
+#########
+DATECACHE = 4096		#Maximum number of distinct strings remembered by convert()
+EXCELBASE = datetime.date(1900,1,1).toordinal() - 2	#Minus 2 days as Excel is inclusive
+DAYMONTHYEAR = re.compile(r'([0-2][0-9]|3[0-1])[\/\-](0[1-9]|1[0-2])[\/\-](20[0-2][0-9])')	#DD-MM-YYYY Format
+YEARMONTHDAY = re.compile(r'(20[0-2][0-9])[\/\-](0[1-9]|1[0-2])[\/\-]([0-2][0-9]|3[0-1])')	#YYYY-MM-DD Format
+EXCELSERIAL = re.compile(r'([3-5][0-9]{4})')							#Excel number format
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: convert
+# Converts a date in any of the roster's accepted formats into a date object
+#
+# Parameter(s):
+#	xdate: The date to convert
+#	-- Datatype: String ('DD/MM/YYYY', 'YYYY-MM-DD' or Excel serial),
+#		Int/Float (Excel serial) or Python datetime.date Object
+# Returns:
+#	Python datetime.date Object, or None if the date is not recognised
+#//////////////////////////////////////////////////////////////////
+def convert(xdate):
+	if isinstance(xdate,datetime.datetime):
+		return xdate.date()
+	elif isinstance(xdate,datetime.date):
+		return xdate
+	elif isinstance(xdate,(int,float)):
+		return excelDate(xdate)
+	else:
+		return _parse(xdate)
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: convertColumn
+# Converts a whole column of dates at once
+# Repeated values and Excel serials skip the regex matching entirely
+#
+# Parameter(s):
+#	column: Dates to convert, in any format accepted by convert()
+#	-- Datatype: Array
+# Returns:
+#	Array of Python datetime.date Objects (None where not recognised)
+#//////////////////////////////////////////////////////////////////
+def convertColumn(column):
+	seen = {}
+	arr = []
+	for xdate in column:
+		try:
+			converted = seen[xdate]
+		except KeyError:
+			if isinstance(xdate,str) and len(xdate) == 5 and xdate.isdigit() and xdate[0] in '345':
+				converted = excelDate(int(xdate))		#Plain Excel serial, no regex required
+			else:
+				converted = convert(xdate)
+			seen[xdate] = converted
+		except TypeError:		#Unhashable value
+			converted = convert(xdate)
+		arr.append(converted)
+	return arr
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: excelDate
+# Converts an Excel Date serial number into a date object
+#
+# Parameter(s):
+#	xdate: Excel Date serial number
+#	-- Datatype: String, Float or Int
+# Returns:
+#	Python datetime.date Object
+#//////////////////////////////////////////////////////////////////
+def excelDate(xdate):
+	return datetime.date.fromordinal(EXCELBASE + int(float(xdate)))
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: key
+# Returns the 'DD/MM/YYYY' string used to key roster output by date
+#
+# Parameter(s):
+#	xdate: The date to format
+#	-- Datatype: Python datetime.date Object
+# Returns:
+#	String in 'DD/MM/YYYY' format
+#//////////////////////////////////////////////////////////////////
+def key(xdate):
+	return _key(xdate.toordinal())
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: _parse
+# Regex matches a date string and converts to a date object
+# Results are memoised, so each distinct string is only matched once
+#//////////////////////////////////////////////////////////////////
+@lru_cache(maxsize=DATECACHE)
+def _parse(xdate):
+	d = DAYMONTHYEAR.match(xdate)
+	if d:
+		return datetime.date(int(d.group(3)),int(d.group(2)),int(d.group(1)))
+	d = YEARMONTHDAY.match(xdate)
+	if d:
+		return datetime.date(int(d.group(1)),int(d.group(2)),int(d.group(3)))
+	d = EXCELSERIAL.match(xdate)
+	if d:
+		return excelDate(int(d.group(1)))
+	return None
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: _key
+# Formats a date ordinal as 'DD/MM/YYYY', memoised per ordinal
+#//////////////////////////////////////////////////////////////////
+@lru_cache(maxsize=DATECACHE)
+def _key(ordinal):
+	return datetime.date.fromordinal(ordinal).strftime('%d/%m/%Y')
@@ -1,8 +1,14 @@
 #!/usr/bin/env python
 
 import person
+from bisect import bisect_left, bisect_right
 import datetime
 
+#########
+# GLOBALS
+#########
+BLANKSHIFT = ''		#Shift of staff members past the end of a short row, as per matrix.BLANKSHIFT
+
 #//////////////////////////////////////////////////////////////////
 # CLASS: Day
 # Used to create a 'Day' Object within the Roster Class
@@ -49,6 +55,16 @@ class Day:
 	def showMember(self,xstaff):
 		return self.__showMember(xstaff)
 
+	def details(self,xstaff):
+		return self.__working[xstaff].details()
+
+	def update(self,xstaff,xshift):
+		return self.__update(xstaff,xshift)
+
+	def shifts(self,staff):
+		working = self.__working
+		return [working[name].shift() if name in working else None for name in staff]
+
 #//////////////////////////////////////////////////////////////////
 # CORE FUNCTIONS
 # Required to build the core variables of the Class
@@ -101,6 +117,24 @@ class Day:
 	def __addMember(self,xstaff,xdefault):
 		self.__working[xstaff] = person.Person(self.__date,xstaff,xdefault)
 
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__update
+	# Replaces the shift of a staff member, if it has changed
+	#
+	# Parameter(s):
+	#	xstaff: Name of the staff member
+	#	-- Datatype: String
+	#	xshift: Name of the new shift
+	#	-- Datatype: String
+	# Returns:
+	#	The previous shift name, or None if the staff member was not working this day
+	#//////////////////////////////////////////////////////////
+	def __update(self,xstaff,xshift):
+		old = self.__working[xstaff].shift() if xstaff in self.__working else None
+		if old != xshift:
+			self.__working[xstaff] = person.Person(self.__date,xstaff,xshift)
+		return old
+
 	#//////////////////////////////////////////////////////////
 	# FUNCTION: self.__showMember
 	# Returns a the shift name of the desired staff member as a dict object
@@ -115,3 +149,199 @@ class Day:
 		staff = {}
 		staff[xstaff] = self.__working[xstaff].shift()
 		return staff
+
+#//////////////////////////////////////////////////////////////////
+# CLASS: Days
+# Default storage engine for the Roster class
+# Holds one Day Object per date of the roster, each containing a Person
+# and Shift Object per staff member
+# Days are kept sorted by date ordinal, so a date range is a bisect and a slice
+#
+# Parameter(s):
+#	staff: The staff names of each column of the roster (excluding the date column)
+#	-- Datatype: Array
+#//////////////////////////////////////////////////////////////////
+class Days:
+	def __init__(self,staff):
+		self.__staff = list(staff)
+		self.__ordinals = []	#Sorted date ordinal of each day
+		self.__days = []		#Day Object for each ordinal
+
+	def __len__(self):
+		return len(self.__days)
+
+#//////////////////////////////////////////////////////////////////
+# PUBLIC FUNCTIONS
+# Callable by the Roster class to populate and query the days
+#//////////////////////////////////////////////////////////////////
+	def staff(self):
+		return list(self.__staff)
+
+	def dates(self):
+		return [day.date() for day in self.__days]
+
+	def period(self,xstart,xfinish):
+		lo,hi = self.__getDays(xstart,xfinish)
+		return [day.date() for day in self.__days[lo:hi]]
+
+	def hasDate(self,xdate):
+		ordinal = xdate.toordinal()
+		n = bisect_left(self.__ordinals,ordinal)
+		return n < len(self.__ordinals) and self.__ordinals[n] == ordinal
+
+	def append(self,xdate,row):
+		self.__append(xdate,row)
+
+	def working(self,xdate):
+		return self.__getDay(xdate).working()
+
+	def shift(self,xdate,xstaff):
+		return self.__getDay(xdate).showMember(xstaff)[xstaff]
+
+	def member(self,xstaff):
+		return self.__member(xstaff,self.__days)
+
+	def memberPeriod(self,xstaff,xstart,xfinish):
+		lo,hi = self.__getDays(xstart,xfinish)
+		return self.__member(xstaff,self.__days[lo:hi])
+
+	def table(self,staff,xstart,xfinish):
+		for name in staff:
+			if name not in self.__staff:
+				raise KeyError(name)
+		lo,hi = self.__getDays(xstart,xfinish)
+		days = self.__days[lo:hi]
+		return [day.date() for day in days],[day.shifts(staff) for day in days]
+
+	def counts(self,xstart,xfinish):
+		lo,hi = self.__getDays(xstart,xfinish)
+		counts = dict((staff,{}) for staff in self.__staff)
+		for day in self.__days[lo:hi]:
+			for staff,shift in day.working().items():
+				tally = counts.setdefault(staff,{})
+				tally[shift] = tally.get(shift,0) + 1
+		return counts
+
+	def update(self,xstaff,xstart,xfinish,xshift):
+		if xstaff not in self.__staff:
+			raise KeyError(xstaff)
+		lo,hi = self.__getDays(xstart,xfinish)
+		changed = []
+		for day in self.__days[lo:hi]:
+			old = day.update(xstaff,xshift)
+			if old != xshift:
+				changed.append((day.date(),old))
+		return changed
+
+	def addMember(self,xstaff,xdefault):
+		if xstaff in self.__staff:
+			raise KeyError(xstaff + " already exists!")
+		for day in self.__days:
+			day.addMember(xstaff,xdefault)
+		self.__staff.append(xstaff)
+
+	def removeMember(self,xstaff):
+		if xstaff not in self.__staff:
+			raise KeyError(xstaff)
+		for day in self.__days:
+			day.removeMember(xstaff)
+		self.__staff.remove(xstaff)
+
+#//////////////////////////////////////////////////////////////////
+# CORE FUNCTIONS
+# Required to build the Day Objects
+#//////////////////////////////////////////////////////////////////
+	# FUNCTION: self.__appendShiftsToStaff
+	# Converts a row of shift names into a dict against the staff names
+	# Staff past the end of a short row are given BLANKSHIFT, and extra cells are ignored
+	#
+	# Parameter(s):
+	#	row: A row of shifts to be associated with the staff names
+	#	-- Datatype: Array
+	#	staff: Staff names to be associated with each corresponding column of the row
+	#	-- Datatype: Array
+	# Returns:
+	#	A dictionary of row columns associated with corresponding staff names
+	#	{'StaffA':'ShiftA', 'StaffB':'ShiftB', 'StaffC':'ShiftC'}
+	#//////////////////////////////////////////////////////////
+	def __appendShiftsToStaff(self,row,staff):
+		shifts = {}
+		for n in range(0,len(staff)):
+			shifts[staff[n]] = row[n] if n < len(row) else BLANKSHIFT
+		return shifts
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__append
+	# Adds a Day Object for a row of shift names in date order
+	# Replaces the existing Day if the date is already held
+	#
+	# Parameter(s):
+	#	xdate: Date of the row
+	#	-- Datatype: Python datetime.date Object
+	#	row: Shift names for each staff member, in staff order
+	#	-- Datatype: Array
+	#//////////////////////////////////////////////////////////
+	def __append(self,xdate,row):
+		ordinal = xdate.toordinal()
+		newday = Day(xdate,self.__appendShiftsToStaff(row,self.__staff))
+		if not self.__ordinals or ordinal > self.__ordinals[-1]:	#Usual case - rows arrive in date order
+			self.__ordinals.append(ordinal)
+			self.__days.append(newday)
+			return
+		n = bisect_left(self.__ordinals,ordinal)
+		if self.__ordinals[n] == ordinal:
+			self.__days[n] = newday
+		else:
+			self.__ordinals.insert(n,ordinal)
+			self.__days.insert(n,newday)
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__getDay
+	# Returns the Day Object of a date. Raises KeyError if it is not held
+	#//////////////////////////////////////////////////////////
+	def __getDay(self,xdate):
+		ordinal = xdate.toordinal()
+		n = bisect_left(self.__ordinals,ordinal)
+		if n == len(self.__ordinals) or self.__ordinals[n] != ordinal:
+			raise KeyError(xdate)
+		return self.__days[n]
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__getDays
+	# Returns the first and last (exclusive) positions within a date range
+	#
+	# Parameter(s):
+	#	xstart,xfinish: Start and finish dates (inclusive)
+	#	-- Datatype: Python datetime.date Object
+	# Returns:
+	#	Tuple of Integer positions (lo,hi) for slicing
+	#//////////////////////////////////////////////////////////
+	def __getDays(self,xstart,xfinish):
+		lo = bisect_left(self.__ordinals,xstart.toordinal())
+		hi = bisect_right(self.__ordinals,xfinish.toordinal(),lo)
+		return lo,hi
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__member
+	# Returns the date and shift name of a staff member for each Day given
+	# Days the staff member is not rostered on are skipped
+	# Raises KeyError if the staff member does not exist
+	#
+	# Parameter(s):
+	#	xstaff: Name of the staff member
+	#	-- Datatype: String
+	#	days: Day Objects to search
+	#	-- Datatype: Array
+	# Returns:
+	#	Array of (datetime.date, 'Shift') tuples in date order
+	#//////////////////////////////////////////////////////////
+	def __member(self,xstaff,days):
+		if xstaff not in self.__staff:
+			raise KeyError(xstaff)
+		arr = []
+		for day in days:
+			try:
+				arr.append((day.date(),day.showMember(xstaff)[xstaff]))
+			except KeyError:
+				continue
+		return arr
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+
+#//////////////////////////////////////////////////////////////////
+# CLASS: Diff
+# Compares two Roster objects cell by cell over a date range
+# Both rosters are read once, after which changes can be looked up per staff member
+#
+# Parameter(s):
+#	previous: The older version of the roster
+#	-- Datatype: roster.Roster Object
+#	current: The newer version of the roster
+#	-- Datatype: roster.Roster Object
+#	xstart,xfinish: Start and finish dates of the range to compare
+#	-- Datatype: String
+#//////////////////////////////////////////////////////////////////
+class Diff:
+	def __init__(self,previous,current,xstart,xfinish):
+		self.__previous = previous.showPeriod(xstart,xfinish)
+		self.__current = current.showPeriod(xstart,xfinish)
+		self.__changes = self.__compare(self.__previous,self.__current)
+		self.__index = self.__buildIndex(self.__changes)
+
+	def __len__(self):
+		return len(self.__changes)
+
+#//////////////////////////////////////////////////////////////////
+# PUBLIC FUNCTIONS
+# Returns the results of the comparison
+#//////////////////////////////////////////////////////////////////
+	def changes(self):
+		return list(self.__changes)
+
+	def changed(self,xstaff):
+		return xstaff in self.__index
+
+	def member(self,xstaff):
+		return [self.__changes[n][1:] for n in self.__index.get(xstaff,[])]
+
+	def showCurrent(self,xstaff):
+		return {xstaff:self.__current.get(xstaff,{})}
+
+	def showPrevious(self,xstaff):
+		return {xstaff:self.__previous.get(xstaff,{})}
+
+#//////////////////////////////////////////////////////////////////
+# CORE FUNCTIONS
+# Used to build the comparison
+#//////////////////////////////////////////////////////////////////
+	# FUNCTION: self.__compare
+	# Returns every cell that differs between two periods of a roster
+	# A date or staff member missing from one roster counts as a change to/from None
+	#
+	# Parameter(s):
+	#	previous,current: Periods returned from roster.Roster.showPeriod()
+	#	-- Datatype: Dictionary of {'StaffName':{'DD/MM/YYYY':'Shift'}}
+	# Returns:
+	#	Array of ('StaffName','DD/MM/YYYY','OldShift','NewShift') tuples
+	#//////////////////////////////////////////////////////////
+	def __compare(self,previous,current):
+		changes = []
+		for staff in self.__union(current,previous):
+			old = previous.get(staff,{})
+			new = current.get(staff,{})
+			if old == new:
+				continue
+			for day in self.__union(new,old):
+				if old.get(day) != new.get(day):
+					changes.append((staff,day,old.get(day),new.get(day)))
+		return changes
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__union
+	# Returns the keys of two dictionaries, in order of first appearance
+	#//////////////////////////////////////////////////////////
+	def __union(self,first,second):
+		keys = list(first)
+		keys.extend(key for key in second if key not in first)
+		return keys
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__buildIndex
+	# Returns the positions of each staff member's changes
+	#
+	# Parameter(s):
+	#	changes: Array returned from self.__compare()
+	#	-- Datatype: Array
+	# Returns:
+	#	Dictionary of {'StaffName':[positions]}
+	#//////////////////////////////////////////////////////////
+	def __buildIndex(self,changes):
+		index = {}
+		for n in range(0,len(changes)):
+			index.setdefault(changes[n][0],[]).append(n)
+		return index
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+
+import csv
+import datetime
+
+import dates
+import shifts
+
+#########
+# GLOBALS
+#########
+EXPORTDAYS = 31		#Days read from the roster at a time while exporting
+CALENDARNAME = "Roster"	#Name of exported calendars
+CALENDARID = "-//XlsxToPyRoster//Roster//EN"	#iCalendar PRODID of exported calendars
+UIDDOMAIN = "xlsxtopyroster"	#Domain of the UID of each exported event, kept stable between exports
+CSVQUOTING = csv.QUOTE_ALL	#Quoting of written CSVs, as per the CSV copy written by roster.Roster.fromWorkbook()
+GOOGLEHEADERS = ['Subject','Start Date','Start Time','End Date','End Time','All Day Event','Description','Location','Private']
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: rows
+# Yields the roster one row at a time, in the layout of the converted CSV
+# The roster is read EXPORTDAYS at a time, so the whole table is never held at once
+#
+# Parameter(s):
+#	store: Storage engine of the roster
+#	-- Datatype: day.Days or matrix.Matrix Object
+# Yields:
+#	['Date','StaffName',...], then [Excel date serial,'Shift',...] per date
+#	-- Serials are floats, as read from the workbook
+#//////////////////////////////////////////////////////////////////
+def rows(store):
+	staff = store.staff()
+	yield ['Date'] + staff
+	for period,table in _tables(store,staff,None,None):
+		for day,row in zip(period,table):
+			yield [float(day.toordinal() - dates.EXCELBASE)] + ['' if shift is None else shift for shift in row]
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: worked
+# Yields every worked shift within a date range, with its start and finish
+# Shifts with no working time (e.g. 'Off', leave) are skipped
+#
+# Parameter(s):
+#	store: Storage engine of the roster
+#	-- Datatype: day.Days or matrix.Matrix Object
+#	staff: Staff names to include
+#	-- Datatype: Array of Strings
+#	xstart,xfinish: First and last dates to include, or None for the whole roster
+#	-- Datatype: Python datetime.date Object
+# Yields:
+#	('StaffName','Shift',start datetime,finish datetime) tuples, by date then staff
+#//////////////////////////////////////////////////////////////////
+def worked(store,staff,xstart=None,xfinish=None):
+	midnight = datetime.time(0)
+	for period,table in _tables(store,staff,xstart,xfinish):
+		for day,row in zip(period,table):
+			start = datetime.datetime.combine(day,midnight)
+			for n in range(0,len(row)):
+				if not row[n]:
+					continue
+				offset,length = shifts.shiftSpan(row[n])
+				if length:
+					yield (staff[n],row[n],start + offset,start + offset + length)
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: writeCSV
+# Writes rows to a file object as they are generated, quoting every field
+#
+# Parameter(s):
+#	rows: Rows to write, e.g. from rows()
+#	-- Datatype: Iterable of Arrays
+#	fileobj: Open text file, e.g. open('roster.csv','w',newline='')
+#	-- Datatype: File Object
+#//////////////////////////////////////////////////////////////////
+def writeCSV(rows,fileobj):
+	csv.writer(fileobj,quoting=CSVQUOTING).writerows(rows)
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: calendar
+# Yields the lines of an iCalendar (.ics) feed, one VEVENT per shift
+#
+# Parameter(s):
+#	events: Shifts to include, as yielded by worked()
+#	-- Datatype: Iterable of Tuples
+#	name: Optional. Name of the calendar
+#	-- Datatype: String
+# Yields:
+#	Each line of the feed, ending in CRLF and folded at 75 octets
+#//////////////////////////////////////////////////////////////////
+def calendar(events,name=CALENDARNAME):
+	stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+	yield "BEGIN:VCALENDAR\r\n"
+	yield "VERSION:2.0\r\n"
+	yield "PRODID:" + CALENDARID + "\r\n"
+	yield _fold("X-WR-CALNAME:" + _escape(name))
+	for staff,shift,start,finish in events:
+		yield "BEGIN:VEVENT\r\n"
+		yield _fold("UID:" + start.strftime("%Y%m%dT%H%M") + "-" + _escape(staff) + "@" + UIDDOMAIN)
+		yield "DTSTAMP:" + stamp + "\r\n"
+		yield "DTSTART:" + start.strftime("%Y%m%dT%H%M%S") + "\r\n"
+		yield "DTEND:" + finish.strftime("%Y%m%dT%H%M%S") + "\r\n"
+		yield _fold("SUMMARY:" + _escape(staff + " - " + shift))
+		yield "END:VEVENT\r\n"
+	yield "END:VCALENDAR\r\n"
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: writeCalendar
+# Writes an iCalendar feed to a file object as it is generated
+#
+# Parameter(s):
+#	events: Shifts to include, as yielded by worked()
+#	-- Datatype: Iterable of Tuples
+#	fileobj: Open text file, e.g. open('roster.ics','w',newline='')
+#	-- Datatype: File Object
+#	name: Optional. Name of the calendar
+#	-- Datatype: String
+#//////////////////////////////////////////////////////////////////
+def writeCalendar(events,fileobj,name=CALENDARNAME):
+	fileobj.writelines(calendar(events,name))
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: google
+# Yields the rows of a Google Calendar import CSV, one event per shift
+#
+# Parameter(s):
+#	events: Shifts to include, as yielded by worked()
+#	-- Datatype: Iterable of Tuples
+# Yields:
+#	GOOGLEHEADERS, then a row of the same columns per shift
+#//////////////////////////////////////////////////////////////////
+def google(events):
+	yield list(GOOGLEHEADERS)
+	for staff,shift,start,finish in events:
+		yield [staff + " - " + shift,
+			start.strftime("%m/%d/%Y"),start.strftime("%I:%M %p"),
+			finish.strftime("%m/%d/%Y"),finish.strftime("%I:%M %p"),
+			"False",shift,"","True"]
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: _tables
+# Yields the roster as consecutive tables of up to EXPORTDAYS dates
+#
+# Parameter(s):
+#	store: Storage engine of the roster
+#	-- Datatype: day.Days or matrix.Matrix Object
+#	staff: Staff names of each column
+#	-- Datatype: Array of Strings
+#	xstart,xfinish: First and last dates, or None for the whole roster
+#	-- Datatype: Python datetime.date Object
+# Yields:
+#	Tuples of (dates, rows), as per store.table()
+#//////////////////////////////////////////////////////////////////
+def _tables(store,staff,xstart,xfinish):
+	period = store.dates()
+	if xstart is not None:
+		period = store.period(xstart,xfinish)
+	for n in range(0,len(period),EXPORTDAYS):
+		chunk = period[n:n + EXPORTDAYS]
+		yield store.table(staff,chunk[0],chunk[-1])
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: _escape
+# Escapes a value for an iCalendar text property
+#//////////////////////////////////////////////////////////////////
+def _escape(text):
+	return text.replace("\\","\\\\").replace(";","\\;").replace(",","\\,").replace("\n","\\n")
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: _fold
+# Returns an iCalendar line ending in CRLF, folded so no line exceeds 75 octets
+#//////////////////////////////////////////////////////////////////
+def _fold(line):
+	encoded = line.encode('utf-8')
+	if len(encoded) <= 75:
+		return line + "\r\n"
+	parts = []
+	limit = 75
+	while encoded:
+		cut = min(limit,len(encoded))
+		while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:		#Never split a character
+			cut -= 1
+		parts.append(encoded[:cut].decode('utf-8'))
+		encoded = encoded[cut:]
+		limit = 74		#Continuation lines start with a space
+	return "\r\n ".join(parts) + "\r\n"
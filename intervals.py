@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+
+from array import array
+from bisect import bisect_left, bisect_right
+import datetime
+
+import shifts
+
+#########
+# GLOBALS
+#########
+MINUTETYPE = 'q'	#Signed long long - minutes since 01/01/0001 of each start and finish
+DAYMINUTES = 24 * 60
+
+#//////////////////////////////////////////////////////////////////
+# CLASS: Intervals
+# An index of when every shift of a roster starts and finishes
+# Shifts are held as sorted arrays of start and finish minutes, so the shifts
+# running at a time are found by a bisect over the starts, looking back no
+# further than the longest shift. Overnight shifts are held once, on the day they start
+# Shifts with no working time (e.g. 'Off', leave) are not indexed
+#
+# Parameter(s):
+#	store: Storage engine of the roster to index
+#	-- Datatype: day.Days or matrix.Matrix Object
+#//////////////////////////////////////////////////////////////////
+class Intervals:
+	def __init__(self,store):
+		self.__staff = store.staff()
+		self.__names = []		#Shift names, by position in self.__shifts
+		self.__nameIndex = {}
+		self.__starts = array(MINUTETYPE)		#Sorted start of each shift
+		self.__finishes = array(MINUTETYPE)	#Finish of each shift
+		self.__people = []		#Staff name of each shift
+		self.__shifts = []		#Position in self.__names of each shift
+		self.__longest = 0		#Minutes of the longest shift indexed
+		self.__build(store)
+
+	def __len__(self):
+		return len(self.__starts)
+
+#//////////////////////////////////////////////////////////////////
+# PUBLIC FUNCTIONS
+# Callable by the Roster class to query and maintain the index
+#//////////////////////////////////////////////////////////////////
+	def at(self,xtime):
+		minute = self.__minutes(xtime)
+		return self.__overlapping(minute,minute + 1)
+
+	def between(self,xstart,xfinish):
+		return self.__overlapping(self.__minutes(xstart),self.__minutes(xfinish))
+
+	def add(self,xdate,xstaff,xshift):
+		self.__add(xdate,xstaff,xshift)
+
+	def remove(self,xdate,xstaff,xshift):
+		self.__remove(xdate,xstaff,xshift)
+
+#//////////////////////////////////////////////////////////////////
+# CORE FUNCTIONS
+# Used to build and address the index
+#//////////////////////////////////////////////////////////////////
+	# FUNCTION: self.__build
+	# Indexes every shift of a storage engine, reading it as one table
+	# Each shift name is measured once, then placed on each date it is worked
+	#//////////////////////////////////////////////////////////
+	def __build(self,store):
+		period = store.dates()
+		if not period:
+			return
+		period,rows = store.table(self.__staff,period[0],period[-1])
+		spans = {}
+		entries = []
+		for day,row in zip(period,rows):
+			midnight = day.toordinal() * DAYMINUTES
+			for n in range(0,len(row)):
+				if not row[n]:		#Skips blank (matrix) and missing (days) cells
+					continue
+				span = spans.get(row[n])
+				if span is None:
+					span = spans[row[n]] = self.__span(row[n])
+				if span[1]:
+					entries.append((midnight + span[0],midnight + span[0] + span[1],self.__staff[n],span[2]))
+		entries.sort()
+		for start,finish,staff,code in entries:
+			self.__starts.append(start)
+			self.__finishes.append(finish)
+			self.__people.append(staff)
+			self.__shifts.append(code)
+			self.__longest = max(self.__longest,finish - start)
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__span
+	# Returns the start and length in minutes of a shift name, and its position in self.__names
+	#
+	# Parameter(s):
+	#	xshift: Name of the shift
+	#	-- Datatype: String
+	# Returns:
+	#	Tuple of Integers (minutes after midnight, length in minutes, name position)
+	#//////////////////////////////////////////////////////////
+	def __span(self,xshift):
+		start,length = shifts.shiftSpan(xshift)
+		code = self.__nameIndex.get(xshift)
+		if code is None:
+			code = self.__nameIndex[xshift] = len(self.__names)
+			self.__names.append(xshift)
+		return start // datetime.timedelta(minutes=1),length // datetime.timedelta(minutes=1),code
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__minutes
+	# Converts a datetime into minutes since 01/01/0001, as held in the index
+	#//////////////////////////////////////////////////////////
+	def __minutes(self,xtime):
+		return xtime.toordinal() * DAYMINUTES + xtime.hour * 60 + xtime.minute
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__toTime
+	# Converts minutes since 01/01/0001 back into a datetime
+	#//////////////////////////////////////////////////////////
+	def __toTime(self,minutes):
+		day,minute = divmod(minutes,DAYMINUTES)
+		return datetime.datetime.fromordinal(day) + datetime.timedelta(minutes=minute)
+
+#//////////////////////////////////////////////////////////////////
+# SECONDARY FUNCTIONS
+# Called by the public functions to return and manipulate entries
+#//////////////////////////////////////////////////////////////////
+	# FUNCTION: self.__overlapping
+	# Returns every shift running at any point between two times
+	# Only shifts starting within the longest shift length before the range can
+	# still be running, so just those are checked
+	#
+	# Parameter(s):
+	#	lo,hi: Start (inclusive) and finish (exclusive) of the range, in minutes
+	#	-- Datatype: Integer
+	# Returns:
+	#	Array of ('StaffName','Shift',start datetime,finish datetime) tuples, by start
+	#//////////////////////////////////////////////////////////
+	def __overlapping(self,lo,hi):
+		first = bisect_right(self.__starts,lo - self.__longest)
+		last = bisect_left(self.__starts,hi,first)
+		found = []
+		for n in range(first,last):
+			if self.__finishes[n] > lo:
+				found.append((self.__people[n],self.__names[self.__shifts[n]],self.__toTime(self.__starts[n]),self.__toTime(self.__finishes[n])))
+		return found
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__add
+	# Inserts one shift into the index, keeping the starts sorted
+	#
+	# Parameter(s):
+	#	xdate: Date the shift starts
+	#	-- Datatype: Python datetime.date Object
+	#	xstaff: Name of the staff member
+	#	-- Datatype: String
+	#	xshift: Name of the shift
+	#	-- Datatype: String
+	#//////////////////////////////////////////////////////////
+	def __add(self,xdate,xstaff,xshift):
+		if not xshift:
+			return
+		start,length,code = self.__span(xshift)
+		if not length:
+			return
+		start += xdate.toordinal() * DAYMINUTES
+		n = bisect_right(self.__starts,start)
+		self.__starts.insert(n,start)
+		self.__finishes.insert(n,start + length)
+		self.__people.insert(n,xstaff)
+		self.__shifts.insert(n,code)
+		self.__longest = max(self.__longest,length)
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__remove
+	# Removes one shift from the index, if it is held
+	# Parameters are as per self.__add()
+	#//////////////////////////////////////////////////////////
+	def __remove(self,xdate,xstaff,xshift):
+		if not xshift:
+			return
+		start,length,code = self.__span(xshift)
+		start += xdate.toordinal() * DAYMINUTES
+		for n in range(bisect_left(self.__starts,start),bisect_right(self.__starts,start)):
+			if self.__people[n] == xstaff and self.__shifts[n] == code:
+				del self.__starts[n]
+				del self.__finishes[n]
+				del self.__people[n]
+				del self.__shifts[n]
+				return
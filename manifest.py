@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+
+from bisect import bisect_left, bisect_right
+import datetime
+import json
+import os
+import os.path
+import re
+
+#//////////////////////////////////////////////////////////////////
+# CLASS: Manifest
+# An index of the archived roster files, e.g. './downloaded/' and './converted/'
+# Records the date, path, size and MD5 checksum of each file by extension,
+# so the latest or dated version of a file is a lookup rather than a directory scan
+# The index is saved as JSON and rebuilt from the folders if it is missing
+#
+# Parameter(s):
+#	path: File location of the saved manifest
+#	-- Datatype: String
+#	name: Base naming convention of the archived files, e.g. 'roster'
+#	-- Datatype: String
+#	folders: Archive folders to scan if the manifest needs rebuilding
+#	-- Datatype: Array of Strings
+#//////////////////////////////////////////////////////////////////
+class Manifest:
+	def __init__(self,path,name,folders):
+		self.__path = path
+		self.__name = name
+		self.__entries = self.__load(path)
+		if self.__entries is None:
+			self.__entries = self.__rebuild(folders)
+			self.__save()
+
+#//////////////////////////////////////////////////////////////////
+# PUBLIC FUNCTIONS
+# Callable by program to query/update the manifest
+#//////////////////////////////////////////////////////////////////
+	def add(self,path,xdate,digest=None,**details):
+		self.__add(path,xdate,digest,details)
+		self.__save()
+
+	def remove(self,path):
+		self.__remove(path)
+		self.__save()
+
+	def update(self,path,**details):
+		self.__find(path).update(details)
+		self.__save()
+
+	def latest(self,xtn,before=None):
+		return self.__lookup(xtn,before,bisect_left)
+
+	def asOf(self,xtn,xdate):
+		return self.__lookup(xtn,xdate,bisect_right)
+
+	def entry(self,path):
+		return dict(self.__find(path))
+
+	def digest(self,path):
+		entry = self.__find(path)
+		if entry.get('digest') is None:
+			entry['digest'] = self.__checksum(path)
+			self.__save()
+		return entry['digest']
+
+#//////////////////////////////////////////////////////////////////
+# CORE FUNCTIONS
+# Used to load, rebuild and save the manifest
+#//////////////////////////////////////////////////////////////////
+	# FUNCTION: self.__load
+	# Returns the saved manifest entries, or None if there is no saved manifest
+	#
+	# Returns:
+	#	Dictionary of {'.xtn':[{'date':'YYYYMMDD','path','size','digest'}]}
+	#	-- Entries of each extension are sorted by date
+	#//////////////////////////////////////////////////////////
+	def __load(self,path):
+		try:
+			with open(path,'r') as manifest:
+				return json.load(manifest)
+		except (IOError,OSError,ValueError):
+			return None
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__save
+	# Writes the manifest to disk, replacing the previous copy in one step
+	#//////////////////////////////////////////////////////////
+	def __save(self):
+		temp = self.__path + ".tmp"
+		with open(temp,'w') as manifest:
+			json.dump(self.__entries,manifest,indent=1,sort_keys=True)
+		os.replace(temp,self.__path)
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__rebuild
+	# Scans the archive folders once for files named 'nameYYYYMMDD.xtn'
+	#
+	# Parameter(s):
+	#	folders: Folders to scan
+	#	-- Datatype: Array of Strings
+	# Returns:
+	#	Dictionary of entries, as per self.__load()
+	#//////////////////////////////////////////////////////////
+	def __rebuild(self,folders):
+		self.__entries = {}
+		pattern = re.compile(re.escape(self.__name) + r'([0-9]{8})(\.\w+)$')
+		for folder in folders:
+			try:
+				files = os.listdir(folder)
+			except OSError:
+				continue
+			for filename in files:
+				match = pattern.match(filename)
+				if match:
+					self.__add(os.path.join(folder,filename),match.group(1),None,{})
+		return self.__entries
+
+#//////////////////////////////////////////////////////////////////
+# SECONDARY FUNCTIONS
+# Called by the public functions to return and manipulate entries
+#//////////////////////////////////////////////////////////////////
+	# FUNCTION: self.__add
+	# Adds or replaces the entry of a file, keeping entries sorted by date
+	#
+	# Parameter(s):
+	#	path: File location of the archived file
+	#	-- Datatype: String
+	#	xdate: Date of the file
+	#	-- Datatype: String ('YYYYMMDD') or Python datetime.date Object
+	#	digest: MD5 checksum of the file, or None to calculate on request
+	#	-- Datatype: String
+	#	details: Any further details to save against the file
+	#	-- Datatype: Dictionary
+	#//////////////////////////////////////////////////////////
+	def __add(self,path,xdate,digest,details):
+		if isinstance(xdate,datetime.date):
+			xdate = xdate.strftime("%Y%m%d")
+		entry = {'date':xdate,'path':path,'size':os.path.getsize(path),'digest':digest}
+		entry.update(details)
+		entries = self.__entries.setdefault(os.path.splitext(path)[1],[])
+		for n in range(0,len(entries)):
+			if entries[n]['path'] == path:
+				del entries[n]
+				break
+		entries.insert(bisect_right(entries,xdate,key=self.__date),entry)
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__remove
+	# Removes the entry of a file, if it exists
+	#//////////////////////////////////////////////////////////
+	def __remove(self,path):
+		entries = self.__entries.get(os.path.splitext(path)[1],[])
+		self.__entries[os.path.splitext(path)[1]] = [e for e in entries if e['path'] != path]
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__find
+	# Returns the entry of a file. Raises KeyError if it is not in the manifest
+	#//////////////////////////////////////////////////////////
+	def __find(self,path):
+		for entry in self.__entries.get(os.path.splitext(path)[1],[]):
+			if entry['path'] == path:
+				return entry
+		raise KeyError(path + " is not in the manifest")
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__lookup
+	# Returns the newest entry of an extension dated before (or on) a date
+	# Entries whose file has since been deleted are dropped
+	#
+	# Parameter(s):
+	#	xtn: File extension, e.g. '.xlsx'
+	#	-- Datatype: String
+	#	xdate: Date to search back from, or None for the newest entry
+	#	-- Datatype: String ('YYYYMMDD') or Python datetime.date Object
+	#	bisect: bisect_left to exclude xdate, bisect_right to include it
+	#	-- Datatype: Function
+	# Returns:
+	#	Dictionary of the entry, or None if there is no such entry
+	#//////////////////////////////////////////////////////////
+	def __lookup(self,xtn,xdate,bisect):
+		entries = self.__entries.get(xtn,[])
+		if xdate is None:
+			n = len(entries)
+		else:
+			if isinstance(xdate,datetime.date):
+				xdate = xdate.strftime("%Y%m%d")
+			n = bisect(entries,xdate,key=self.__date)
+		while n > 0:
+			entry = entries[n - 1]
+			if os.path.isfile(entry['path']):
+				return dict(entry)
+			self.remove(entry['path'])
+			entries = self.__entries.get(xtn,[])
+			n = n - 1
+		return None
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__date
+	# Returns the 'YYYYMMDD' date of an entry, used as the bisect key
+	#//////////////////////////////////////////////////////////
+	def __date(self,entry):
+		return entry['date']
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__checksum
+	# Returns the MD5 checksum of a file, reading it in chunks
+	#//////////////////////////////////////////////////////////
+	def __checksum(self,path):
+		import hashlib		#Only required when a checksum was not saved
+
+		checksum = hashlib.md5()
+		with open(path,'rb') as checkfile:
+			for chunk in iter(lambda: checkfile.read(64 * 1024),b''):
+				checksum.update(chunk)
+		return checksum.hexdigest()
@@ -0,0 +1,393 @@
+#!/usr/bin/env python
+
+from array import array
+from collections import Counter
+from bisect import bisect_left, bisect_right
+import datetime
+
+#########
+# GLOBALS
+#########
+CELLTYPE = 'H'		#Unsigned short - up to 65535 distinct shift names per roster
+ORDINALTYPE = 'l'	#Signed long - date ordinal of each row
+BLANKSHIFT = ''		#Shift code 0 is always the blank cell
+
+#//////////////////////////////////////////////////////////////////
+# CLASS: Matrix
+# Columnar storage engine for the Roster class
+# Stores every cell of the roster as a small integer shift code in a single
+# flat array, alongside a staff axis, a date axis and a shift code table.
+# Memory grows with the number of cells rather than the number of Python objects.
+# Rows are kept sorted by date ordinal, so a date range is a bisect and a slice.
+#
+# Parameter(s):
+#	staff: The staff names of each column of the roster (excluding the date column)
+#	-- Datatype: Array
+#	codes,ordinals,cells: Optional. Existing shift code table, sorted date ordinals
+#		and row-major cells to hold, e.g. memoryviews of a snapshot file.
+#		Read-only buffers are copied into arrays the first time they are changed
+#	-- Datatype: Array, or any buffer supporting indexing and slicing
+#//////////////////////////////////////////////////////////////////
+class Matrix:
+	def __init__(self,staff,codes=None,ordinals=None,cells=None):
+		self.__staff = list(staff)
+		self.__staffIndex = self.__buildIndex(self.__staff)
+		self.__ordinals = array(ORDINALTYPE) if ordinals is None else ordinals	#Sorted date ordinal of each row
+		self.__codes = [BLANKSHIFT] if codes is None else list(codes)	#shift code : shift name
+		self.__codeIndex = self.__buildIndex(self.__codes)	#shift name : shift code
+		self.__cells = array(CELLTYPE) if cells is None else cells
+
+	def __len__(self):
+		return len(self.__ordinals)
+
+#//////////////////////////////////////////////////////////////////
+# PUBLIC FUNCTIONS
+# Callable by the Roster class to populate and query the matrix
+#//////////////////////////////////////////////////////////////////
+	def staff(self):
+		return list(self.__staff)
+
+	def dates(self):
+		return [datetime.date.fromordinal(ordinal) for ordinal in self.__ordinals]
+
+	def period(self,xstart,xfinish):
+		lo,hi = self.__getRows(xstart,xfinish)
+		return [datetime.date.fromordinal(ordinal) for ordinal in self.__ordinals[lo:hi]]
+
+	def codes(self):
+		return list(self.__codes)
+
+	def ordinals(self):
+		return self.__ordinals
+
+	def cells(self):
+		return self.__cells
+
+	def hasDate(self,xdate):
+		ordinal = xdate.toordinal()
+		row = bisect_left(self.__ordinals,ordinal)
+		return row < len(self.__ordinals) and self.__ordinals[row] == ordinal
+
+	def append(self,xdate,row):
+		self.__append(xdate,row)
+
+	def working(self,xdate):
+		return self.__working(self.__getRow(xdate))
+
+	def shift(self,xdate,xstaff):
+		return self.__codes[self.__cells[self.__getCell(self.__getRow(xdate),self.__getColumn(xstaff))]]
+
+	def member(self,xstaff):
+		return self.__member(self.__getColumn(xstaff),0,len(self.__ordinals))
+
+	def memberPeriod(self,xstaff,xstart,xfinish):
+		lo,hi = self.__getRows(xstart,xfinish)
+		return self.__member(self.__getColumn(xstaff),lo,hi)
+
+	def table(self,staff,xstart,xfinish):
+		columns = [self.__getColumn(name) for name in staff]
+		lo,hi = self.__getRows(xstart,xfinish)
+		return self.period(xstart,xfinish),self.__table(columns,lo,hi)
+
+	def counts(self,xstart,xfinish):
+		lo,hi = self.__getRows(xstart,xfinish)
+		return self.__counts(lo,hi)
+
+	def update(self,xstaff,xstart,xfinish,xshift):
+		column = self.__getColumn(xstaff)
+		lo,hi = self.__getRows(xstart,xfinish)
+		return self.__update(column,lo,hi,xshift)
+
+	def addMember(self,xstaff,xdefault):
+		self.__addMember(xstaff,xdefault)
+
+	def removeMember(self,xstaff):
+		self.__removeMember(xstaff)
+
+#//////////////////////////////////////////////////////////////////
+# CORE FUNCTIONS
+# Used to build and address the matrix
+#//////////////////////////////////////////////////////////////////
+	# FUNCTION: self.__buildIndex
+	# Returns a dictionary of each item in an array against its position
+	#
+	# Parameter(s):
+	#	arr: Array of hashable values
+	#	-- Datatype: Array
+	# Returns:
+	#	Dictionary of {value:index}
+	#//////////////////////////////////////////////////////////
+	def __buildIndex(self,arr):
+		index = {}
+		for n in range(0,len(arr)):
+			index[arr[n]] = n
+		return index
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__getCode
+	# Returns the shift code for a shift name, adding it to the code table if new
+	#
+	# Parameter(s):
+	#	xshift: Name of the shift
+	#	-- Datatype: String
+	# Returns:
+	#	Integer shift code
+	#//////////////////////////////////////////////////////////
+	def __getCode(self,xshift):
+		code = self.__codeIndex.get(xshift)
+		if code is None:
+			code = len(self.__codes)
+			self.__codes.append(xshift)
+			self.__codeIndex[xshift] = code
+		return code
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__getRow
+	# Returns the row number of a date within the matrix
+	#
+	# Parameter(s):
+	#	xdate: Date of the row
+	#	-- Datatype: Python datetime.date Object
+	# Returns:
+	#	Integer row number. Raises KeyError if the date is not in the roster
+	#//////////////////////////////////////////////////////////
+	def __getRow(self,xdate):
+		ordinal = xdate.toordinal()
+		row = bisect_left(self.__ordinals,ordinal)
+		if row == len(self.__ordinals) or self.__ordinals[row] != ordinal:
+			raise KeyError(xdate)
+		return row
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__getRows
+	# Returns the first and last (exclusive) rows within a date range
+	#
+	# Parameter(s):
+	#	xstart,xfinish: Start and finish dates (inclusive)
+	#	-- Datatype: Python datetime.date Object
+	# Returns:
+	#	Tuple of Integer row numbers (lo,hi) for slicing
+	#//////////////////////////////////////////////////////////
+	def __getRows(self,xstart,xfinish):
+		lo = bisect_left(self.__ordinals,xstart.toordinal())
+		hi = bisect_right(self.__ordinals,xfinish.toordinal(),lo)
+		return lo,hi
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__getColumn
+	# Returns the column number of a staff member within the matrix
+	#
+	# Parameter(s):
+	#	xstaff: Name of the staff member
+	#	-- Datatype: String
+	# Returns:
+	#	Integer column number. Raises KeyError if the staff member does not exist
+	#//////////////////////////////////////////////////////////
+	def __getColumn(self,xstaff):
+		return self.__staffIndex[xstaff]
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__getCell
+	# Returns the position of a cell within the flat cell array
+	#//////////////////////////////////////////////////////////
+	def __getCell(self,row,column):
+		return row * len(self.__staff) + column
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__writable
+	# Copies buffers handed to the constructor into arrays before they are changed
+	#//////////////////////////////////////////////////////////
+	def __writable(self):
+		if not isinstance(self.__ordinals,array):
+			self.__ordinals = array(ORDINALTYPE,self.__ordinals)
+		if not isinstance(self.__cells,array):
+			self.__cells = array(CELLTYPE,self.__cells)
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__append
+	# Adds a row of shift names to the matrix in date order
+	# Replaces the existing row if the date is already within the matrix
+	#
+	# Parameter(s):
+	#	xdate: Date of the row
+	#	-- Datatype: Python datetime.date Object
+	#	row: Shift names for each staff member, in staff axis order
+	#		Short rows are padded with blank shifts
+	#	-- Datatype: Array
+	#//////////////////////////////////////////////////////////
+	def __append(self,xdate,row):
+		self.__writable()
+		width = len(self.__staff)
+		codes = [self.__getCode(shift) for shift in row[:width]]
+		codes.extend([0] * (width - len(codes)))
+		ordinal = xdate.toordinal()
+		if not self.__ordinals or ordinal > self.__ordinals[-1]:	#Usual case - rows arrive in date order
+			self.__ordinals.append(ordinal)
+			self.__cells.extend(codes)
+			return
+		row = bisect_left(self.__ordinals,ordinal)
+		start = self.__getCell(row,0)
+		if self.__ordinals[row] == ordinal:		#Later rows replace earlier rows of the same date
+			self.__cells[start:start + width] = array(CELLTYPE,codes)
+		else:
+			self.__ordinals.insert(row,ordinal)
+			self.__cells[start:start] = array(CELLTYPE,codes)
+
+#//////////////////////////////////////////////////////////////////
+# SECONDARY FUNCTIONS
+# Called by the public functions to return and manipulate data
+#//////////////////////////////////////////////////////////////////
+	# FUNCTION: self.__working
+	# Returns a dict of every staff member and their shift name for a row
+	#
+	# Parameter(s):
+	#	row: Row number of the matrix
+	#	-- Datatype: Integer
+	# Returns:
+	#	Dictionary of {'StaffName':'Shift'}
+	#//////////////////////////////////////////////////////////
+	def __working(self,row):
+		width = len(self.__staff)
+		cells = self.__cells[row * width:(row + 1) * width]
+		working = {}
+		for n in range(0,width):
+			working[self.__staff[n]] = self.__codes[cells[n]]
+		return working
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__member
+	# Returns each date and shift name for a column of the matrix between two rows
+	#
+	# Parameter(s):
+	#	column: Column number of the staff member
+	#	-- Datatype: Integer
+	#	lo,hi: First and last (exclusive) rows to return
+	#	-- Datatype: Integer
+	# Returns:
+	#	Array of (datetime.date, 'Shift') tuples in date order
+	#//////////////////////////////////////////////////////////
+	def __member(self,column,lo,hi):
+		width = len(self.__staff)
+		cells = self.__cells[lo * width + column:hi * width:width]
+		ordinals = self.__ordinals[lo:hi]
+		codes = self.__codes
+		return [(datetime.date.fromordinal(ordinals[n]),codes[cells[n]]) for n in range(0,len(cells))]
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__table
+	# Returns the shift names of a set of columns for each row between two rows
+	# Each row is sliced once, rather than once per column
+	#
+	# Parameter(s):
+	#	columns: Column numbers of the staff members, in the order to return them
+	#	-- Datatype: Array of Integers
+	#	lo,hi: First and last (exclusive) rows to return
+	#	-- Datatype: Integer
+	# Returns:
+	#	2-Dimensional Array of 'Shift' names, one row per date
+	#//////////////////////////////////////////////////////////
+	def __table(self,columns,lo,hi):
+		width = len(self.__staff)
+		codes = self.__codes
+		cells = self.__cells
+		if columns == list(range(0,width)):		#Every staff member, in staff axis order
+			return [[codes[code] for code in cells[row * width:(row + 1) * width]] for row in range(lo,hi)]
+		rows = []
+		for row in range(lo,hi):
+			cellrow = cells[row * width:(row + 1) * width]
+			rows.append([codes[cellrow[column]] for column in columns])
+		return rows
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__counts
+	# Counts each shift name per column of the matrix between two rows
+	# Each column is counted as one strided slice rather than cell by cell
+	#
+	# Parameter(s):
+	#	lo,hi: First and last (exclusive) rows to count
+	#	-- Datatype: Integer
+	# Returns:
+	#	Dictionary of {'StaffName':{'Shift':count}}
+	#//////////////////////////////////////////////////////////
+	def __counts(self,lo,hi):
+		width = len(self.__staff)
+		counts = {}
+		for column in range(0,width):
+			tally = Counter(self.__cells[lo * width + column:hi * width:width])
+			counts[self.__staff[column]] = dict((self.__codes[code],tally[code]) for code in tally)
+		return counts
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__update
+	# Sets the shift name of a column of the matrix between two rows
+	# Only cells holding a different shift are written
+	#
+	# Parameter(s):
+	#	column: Column number of the staff member
+	#	-- Datatype: Integer
+	#	lo,hi: First and last (exclusive) rows to set
+	#	-- Datatype: Integer
+	#	xshift: Name of the new shift
+	#	-- Datatype: String
+	# Returns:
+	#	Array of (datetime.date, 'OldShift') tuples for each changed cell
+	#//////////////////////////////////////////////////////////
+	def __update(self,column,lo,hi,xshift):
+		if lo == hi:
+			return []
+		self.__writable()
+		width = len(self.__staff)
+		code = self.__getCode(xshift)
+		changed = []
+		for row in range(lo,hi):
+			cell = row * width + column
+			old = self.__cells[cell]
+			if old != code:
+				self.__cells[cell] = code
+				changed.append((datetime.date.fromordinal(self.__ordinals[row]),self.__codes[old]))
+		return changed
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__addMember
+	# Adds a new column to the matrix with a default shift for every row
+	#
+	# Parameter(s):
+	#	xstaff: Name of the staff member to add
+	#	-- Datatype: String
+	#	xdefault: Name of the shift to assign on every day
+	#	-- Datatype: String
+	#//////////////////////////////////////////////////////////
+	def __addMember(self,xstaff,xdefault):
+		if xstaff in self.__staffIndex:
+			raise KeyError(xstaff + " already exists!")
+		self.__writable()
+		width = len(self.__staff)
+		code = self.__getCode(xdefault)
+		cells = array(CELLTYPE)
+		for row in range(0,len(self.__ordinals)):
+			cells.extend(self.__cells[row * width:(row + 1) * width])
+			cells.append(code)
+		self.__cells = cells
+		self.__staffIndex[xstaff] = width
+		self.__staff.append(xstaff)
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__removeMember
+	# Removes the column of a staff member from the matrix
+	#
+	# Parameter(s):
+	#	xstaff: Name of the staff member to remove
+	#	-- Datatype: String
+	#//////////////////////////////////////////////////////////
+	def __removeMember(self,xstaff):
+		column = self.__getColumn(xstaff)
+		self.__writable()
+		width = len(self.__staff)
+		cells = array(CELLTYPE)
+		for row in range(0,len(self.__ordinals)):
+			start = row * width
+			cells.extend(self.__cells[start:start + column])
+			cells.extend(self.__cells[start + column + 1:start + width])
+		self.__cells = cells
+		del self.__staff[column]
+		self.__staffIndex = self.__buildIndex(self.__staff)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+
+from contextlib import contextmanager
+import datetime
+import json
+import time
+
+#//////////////////////////////////////////////////////////////////
+# CLASS: Metrics
+# Records the time taken by each stage of one run, with any counts for that stage
+# e.g. bytes downloaded, rows parsed or emails sent
+# The run is emitted as one JSON line, appended to a file and/or passed to a hook
+#
+# Parameter(s):
+#	source: Name of the roster being processed
+#	-- Datatype: String
+#	path: Optional. File location to append each run to, e.g. './log/metrics.jsonl'
+#	-- Datatype: String
+#	hook: Optional. Function called with the record of each run
+#	-- Datatype: Function
+#//////////////////////////////////////////////////////////////////
+class Metrics:
+	def __init__(self,source,path=None,hook=None):
+		self.__source = source
+		self.__path = path
+		self.__hook = hook
+		self.__started = datetime.datetime.now()
+		self.__begin = time.perf_counter()
+		self.__stages = {}
+
+#//////////////////////////////////////////////////////////////////
+# PUBLIC FUNCTIONS
+# Callable by program to record and emit the run
+#//////////////////////////////////////////////////////////////////
+	def span(self,stage,**counts):
+		return self.__span(stage,counts)
+
+	def stages(self):
+		return dict((stage,dict(fields)) for stage,fields in self.__stages.items())
+
+	def emit(self,ok):
+		return self.__emit(ok)
+
+#//////////////////////////////////////////////////////////////////
+# CORE FUNCTIONS
+# Used to time the stages and write the record
+#//////////////////////////////////////////////////////////////////
+	# FUNCTION: self.__span
+	# Times a stage of the run, e.g.
+	#	with metrics.span('download') as span:
+	#		span['bytes'] = ...
+	# A stage that raises an exception records the error before re-raising it
+	# A stage run more than once adds to its time and counts
+	#
+	# Parameter(s):
+	#	stage: Name of the stage
+	#	-- Datatype: String
+	#	counts: Starting counts of the stage
+	#	-- Datatype: Dictionary of {'count':number}
+	# Yields:
+	#	Dictionary of the counts, to be filled in by the stage
+	#//////////////////////////////////////////////////////////
+	@contextmanager
+	def __span(self,stage,counts):
+		begin = time.perf_counter()
+		try:
+			yield counts
+		except Exception as e:
+			counts['error'] = str(e) or e.__class__.__name__
+			raise
+		finally:
+			counts['seconds'] = time.perf_counter() - begin
+			self.__add(stage,counts)
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__add
+	# Adds the fields of a finished span to its stage
+	#//////////////////////////////////////////////////////////
+	def __add(self,stage,counts):
+		fields = self.__stages.setdefault(stage,{})
+		for field,value in counts.items():
+			if isinstance(value,(int,float)) and not isinstance(value,bool) and field in fields:
+				fields[field] += value
+			else:
+				fields[field] = value
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__emit
+	# Appends the record of the run to self.__path and passes it to self.__hook
+	#
+	# Parameter(s):
+	#	ok: Whether the run completed
+	#	-- Datatype: Boolean
+	# Returns:
+	#	Dictionary of {'time','source','ok','seconds','stages':{'stage':{'seconds',...}}}
+	#//////////////////////////////////////////////////////////
+	def __emit(self,ok):
+		record = {'time':self.__started.isoformat(timespec='seconds'),
+			'source':self.__source,
+			'ok':ok,
+			'seconds':time.perf_counter() - self.__begin,
+			'stages':self.stages()}
+		if self.__path:
+			with open(self.__path,'a') as saved:
+				saved.write(json.dumps(record,sort_keys=True) + "\n")
+		if self.__hook:
+			self.__hook(record)
+		return record
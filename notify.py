@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import smtplib
+import threading
+
+#########
+# GLOBALS
+#########
+MAILCONNECTIONS = 2	#Maximum number of open connections to the mail server
+MAILWORKERS = 4		#Maximum number of emails being sent at once
+MAILTIMEOUT = 30	#Seconds to wait on the mail server
+POOLWAIT = 0.5		#Seconds to wait for an idle connection before checking again
+
+#//////////////////////////////////////////////////////////////////
+# CLASS: Mailer
+# Sends emails through a small pool of reused SMTP connections
+# Emails are sent from a bounded thread pool, and the result of each is reported
+#
+# Parameter(s):
+#	server: The mail server to send through, as 'host' or 'host:port'
+#	-- Datatype: String
+#	connections: Optional. Maximum number of open connections
+#	-- Datatype: Integer
+#	workers: Optional. Maximum number of emails sent at once
+#	-- Datatype: Integer
+#//////////////////////////////////////////////////////////////////
+class Mailer:
+	def __init__(self,server,connections=MAILCONNECTIONS,workers=MAILWORKERS):
+		self.__server = server
+		self.__connections = max(1,connections)
+		self.__workers = max(1,workers)
+		self.__pool = queue.Queue()		#Idle SMTP connections
+		self.__opened = 0
+		self.__lock = threading.Lock()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self,*args):
+		self.close()
+
+#//////////////////////////////////////////////////////////////////
+# PUBLIC FUNCTIONS
+# Callable by program to send emails
+#//////////////////////////////////////////////////////////////////
+	def send(self,sender,recipients,message):
+		self.__send(sender,recipients,message)
+
+	def sendAll(self,messages):
+		return self.__sendAll(messages)
+
+	def close(self):
+		self.__close()
+
+#//////////////////////////////////////////////////////////////////
+# CORE FUNCTIONS
+# Used to manage the pooled connections
+#//////////////////////////////////////////////////////////////////
+	# FUNCTION: self.__acquire
+	# Returns an idle connection, opening a new one if the pool is not yet full
+	# Otherwise waits for another thread to release a connection
+	#//////////////////////////////////////////////////////////
+	def __acquire(self):
+		while True:
+			try:
+				return self.__pool.get_nowait()
+			except queue.Empty:
+				pass
+			with self.__lock:
+				opening = self.__opened < self.__connections
+				if opening:
+					self.__opened += 1
+			if opening:
+				try:
+					return smtplib.SMTP(self.__server,timeout=MAILTIMEOUT)
+				except Exception:
+					self.__discard(None)
+					raise
+			try:
+				return self.__pool.get(timeout=POOLWAIT)
+			except queue.Empty:
+				continue		#Re-check in case a broken connection was discarded
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__release
+	# Returns a healthy connection to the pool for reuse
+	#//////////////////////////////////////////////////////////
+	def __release(self,smtp):
+		self.__pool.put(smtp)
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__discard
+	# Closes a broken connection so that a new one can take its place
+	#//////////////////////////////////////////////////////////
+	def __discard(self,smtp):
+		with self.__lock:
+			self.__opened -= 1
+		if smtp is not None:
+			try:
+				smtp.close()
+			except Exception:
+				pass
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__close
+	# Ends every idle connection in the pool
+	#//////////////////////////////////////////////////////////
+	def __close(self):
+		while True:
+			try:
+				smtp = self.__pool.get_nowait()
+			except queue.Empty:
+				break
+			with self.__lock:
+				self.__opened -= 1
+			try:
+				smtp.quit()
+			except Exception:
+				smtp.close()
+
+#//////////////////////////////////////////////////////////////////
+# SECONDARY FUNCTIONS
+# Called by the public functions to send emails
+#//////////////////////////////////////////////////////////////////
+	# FUNCTION: self.__send
+	# Sends one email over a pooled connection
+	# A connection the server has since dropped is replaced and the email retried once
+	#
+	# Parameter(s):
+	#	sender: Address to send from
+	#	-- Datatype: String
+	#	recipients: Addresses to send to
+	#	-- Datatype: Array of Strings
+	#	message: The full email, e.g. MIMEMultipart().as_string()
+	#	-- Datatype: String
+	#//////////////////////////////////////////////////////////
+	def __send(self,sender,recipients,message):
+		for attempt in range(0,2):
+			smtp = self.__acquire()
+			try:
+				smtp.sendmail(sender,recipients,message)
+			except smtplib.SMTPServerDisconnected:
+				self.__discard(smtp)
+				if attempt:
+					raise
+				continue
+			except smtplib.SMTPRecipientsRefused:
+				self.__release(smtp)		#Connection is still usable
+				raise
+			except Exception:
+				self.__discard(smtp)
+				raise
+			self.__release(smtp)
+			return
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__sendAll
+	# Sends a batch of emails from the thread pool
+	#
+	# Parameter(s):
+	#	messages: Emails to send, as (key, sender, recipients, message) tuples
+	#		The key identifies the email in the results, e.g. the staff name
+	#	-- Datatype: Array
+	# Returns:
+	#	Dictionary of {key:error}, where error is None if the email was sent
+	#//////////////////////////////////////////////////////////
+	def __sendAll(self,messages):
+		results = {}
+		with ThreadPoolExecutor(max_workers=self.__workers) as executor:
+			futures = [(key,executor.submit(self.__send,sender,recipients,message)) for key,sender,recipients,message in messages]
+			for key,future in futures:
+				try:
+					future.result()
+					results[key] = None
+				except Exception as e:
+					results[key] = str(e) or e.__class__.__name__
+		return results
@@ -14,14 +14,16 @@ import shifts
 #	-- Datatype: String
 #	shift: Parsed to the Shift object to determine shift times
 #	-- Datatype: String
+#		- The Shift object is only fetched when its times are requested
 #//////////////////////////////////////////////////////////////////
 class Person:
 	def __init__(self,date,name,shift):
 		self.__name = name
-		self.__shift = shifts.Shift(date,shift)		
+		self.__date = date
+		self.__period = shift
 
 	def __getitem__(self,name):
-		return self.__shift.shift()
+		return self.__period
 
 #//////////////////////////////////////////////////////////////////
 # PUBLIC FUNCTIONS
@@ -34,4 +36,19 @@ class Person:
 	# Returns the 'self.__period' variable of the Shift class object
 	#//////////////////////////////////////////////////////////
 	def shift(self):
-		return self.__shift.shift()
+		return self.__period
+
+	#//////////////////////////////////////////////////////////
+	# Returns the shared Shift class object for this person's shift
+	#//////////////////////////////////////////////////////////
+	def details(self):
+		return shifts.getShift(self.__date,self.__period)
+
+	def start(self):
+		return self.details().start()
+
+	def finish(self):
+		return self.details().finish()
+
+	def hours(self):
+		return self.details().hours()
@@ -6,32 +6,24 @@ import logging
 #Used for naming
 import datetime
 
-#Used for download
-import requests
-from requests.packages.urllib3.exceptions import InsecureRequestWarning
-requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
-import shutil
-from getpass import getpass
-
-#Used for conversion
-import xlrd
-import csv
-
-#Used for email
-import smtplib
-from email.mime.application import MIMEApplication
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.utils import COMMASPACE, formatdate
-
 #Used for verification
-import hashlib
 import os.path
 import os
 
-#Used for comparison and table building
-import roster
+#Used for locating previous versions
+import manifest
+
+#Used for timing each stage
+import metrics
 
+#Everything else is imported by the stage that needs it, so that runs which
+#stop early (file already downloaded, or unchanged) do not pay to import it:
+#	Download - requests, getpass, hashlib (self._download)
+#	Conversion - roster (self._convert, self._loadLastRoster)
+#	Comparison - diff, render (self.process, self._getTemplate)
+#	Email - email.mime, notify (self._email, self._sendEmails)
+#	Several rosters - concurrent.futures (processAll)
+#See checkStartup.py for the import time budget of this module
 
 #/////////////////////////////////////////////
 # GLOBALS
@@ -44,64 +36,201 @@ ROSTERNAME = "roster" #Defines the base naming convention of the output files. e
 MAILSERVER = "mail.example.com"
 FROMEMAIL = "example@example.com"
 MAILRECIPS = {'':['']}
+CHUNKSIZE = 64 * 1024 #Bytes read from the download stream at a time
 # MAILRECIPS - Dictionary of Member headers of roster to check against
 # Key: Column header of staff member (e.g. 'Pettles')
 # Value: An array of email addresses to send result to for that member (e.g. ['pettles@github.com'])
 # e.g. {'Pettles':['pettles@github.com'],'Kevin':['kevin@example.com','kevin@somewhereelse.com']}
+SOURCES = []
+# SOURCES - Array of rosters to process together with processAll()
+# Each is a dictionary of any of the following keys, defaulting to the globals above:
+# 'url' (FILEURL), 'worksheet' (WORKSHEET), 'name' (ROSTERNAME), 'recips' (MAILRECIPS)
+# 'path' - Folder holding the 'downloaded', 'converted' and 'log' folders of the roster (default './')
+# 'user','password' - HTTP Auth details, so the download does not prompt for them
+# 'metricshook' - Function called with each run's metrics (METRICSHOOK)
+# 'watch' - True to keep checking the server after today's roster has been downloaded, e.g. under watch.Watcher
+# e.g. [{'name':'teamA','url':'https://www.example.com/a.xlsx','path':'./teamA/'},
+#       {'name':'teamB','url':'https://www.example.com/b.xlsx','worksheet':'b_roster','path':'./teamB/'}]
+PROCESSWORKERS = None #Maximum number of rosters processed at once by processAll(). None = one per CPU
+METRICSFILE = "metrics.jsonl" #Each run's stage timings and counts are appended here, within the 'log' folder
+METRICSHOOK = None #Optional function called with each run's metrics, e.g. to forward them elsewhere
+# Each run is recorded as {'time','source','ok','seconds','stages':{'stage':{'seconds',...}}}
+# Stages: 'download' (bytes), 'convert' (rows), 'previous' (rows, cached), 'diff' (changes, recipients, changed),
+# 'render' (emails), 'send' (sent, failed)
 #/////////////////////////////////////////////
 
+###################################
+# Processes every roster source in its own process
+# Total time is roughly that of the slowest source rather than the sum of all
+# Returns a dictionary of {name:error}, where error is None if processing completed
+# Raises an Exception if two sources share a name, as they would share files
+###################################
+def processAll(sources=None,workers=PROCESSWORKERS):
+	from concurrent.futures import ProcessPoolExecutor
+
+	sources = SOURCES if sources is None else sources
+	names = [source.get('name',ROSTERNAME) for source in sources]
+	for name in names:
+		if names.count(name) > 1:
+			raise Exception("Roster name '" + name + "' is used by more than one source")
+	results = {}
+	with ProcessPoolExecutor(max_workers=workers) as executor:
+		futures = [(name,executor.submit(_processSource,source)) for name,source in zip(names,sources)]
+		for name,future in futures:
+			try:
+				if future.result():
+					results[name] = None
+				else:
+					results[name] = "Processing failed, see the log of '" + name + "'"
+			except Exception as e:
+				results[name] = str(e)
+	return results
+
+###################################
+# Processes one roster source. Called within the process pool by processAll()
+# Returns True if processing completed, or False if it failed
+###################################
+def _processSource(source):
+	return Roster(source).process()
+
 class Roster:
-	def __init__(self):
-		self._log = self._setupLogging('./log/logs.log')
-		self._name = ROSTERNAME + datetime.datetime.now().strftime("%Y%m%d")
-		self._httppath = FILEURL
-		self._xlsxpath = "./downloaded/"
-		self._csvpath = "./converted/"
+	def __init__(self,source=None):
+		source = source or {}
+		self._source = source.get('name',ROSTERNAME)
+		self._worksheet = source.get('worksheet',WORKSHEET)
+		self._auth = (source['user'],source['password']) if 'user' in source else None
+		basepath = source.get('path',"./")
+		self._logpath = basepath + "log/"
+		self._log = self._setupLogging(self._logpath, "logs.log")
+		self._metricsHook = source.get('metricshook',METRICSHOOK)
+		self._watch = source.get('watch',False)		#Re-download today's roster when it changes on the server
+		self._metrics = None		#Replaced by a new metrics.Metrics on each call to self.process()
+		self._httppath = source.get('url',FILEURL)
+		self._xlsxpath = basepath + "downloaded/"
+		self._csvpath = basepath + "converted/"
 		self._excelxtn = ".xlsx"
 		self._csvxtn = ".csv"
+		self._snapxtn = ".snap"
+		self._setDate(datetime.date.today())
+		self._recips = source.get('recips',MAILRECIPS)
+		for folder in [self._xlsxpath, self._csvpath]:
+			if not os.path.isdir(folder):
+				os.makedirs(folder)
+		self._manifest = manifest.Manifest(self._xlsxpath + self._source + ".manifest", self._source, [self._xlsxpath, self._csvpath])
+		self._outbox = []
+		self._template = None		#Built by self._getTemplate() when first needed
+		self._lastRoster = None		#Latest roster kept in memory between calls to self.process()
+
+	###################################
+	# Sets the date of the files being processed, and resets the per-run state
+	###################################
+	def _setDate(self,date):
+		self._date = date
+		self._name = self._source + self._date.strftime("%Y%m%d")
 		self._xlsxfull = self._xlsxpath + self._name + self._excelxtn
+		self._partfull = self._xlsxfull + ".part"		#Each download, until it is known to be a new version
 		self._csvfull = self._csvpath + self._name + self._csvxtn
-		self._recips = MAILRECIPS
-
-	def _setupLogging(self,logFile):
-		logger = logging.getLogger('myapp')
-		hdlr = logging.FileHandler(logFile)
-		formatter = logging.Formatter('%(asctime)s %(levelname)s %(message)s')
-		hdlr.setFormatter(formatter)
-		logger.addHandler(hdlr)
+		self._snapfull = self._csvpath + self._name + self._snapxtn
+		self._notModified = False
+		self._digest = None
+		self._lastDigest = None
+		self._lastFile = False
+		self._replacing = False		#True when a changed download replaces today's roster
+		self._fetched = {}
+		self._bytes = 0
+
+	def _setupLogging(self,logPath,logFile):
+		if not os.path.isdir(logPath):
+			os.makedirs(logPath)
+		logger = logging.getLogger('myapp.' + self._source + ':' + os.path.abspath(logPath + logFile))		#One per log file
+		if not logger.handlers:		#Only add the handler the first time a log file is set up
+			hdlr = logging.FileHandler(logPath + logFile)
+			formatter = logging.Formatter('%(asctime)s %(levelname)s %(message)s')
+			hdlr.setFormatter(formatter)
+			logger.addHandler(hdlr)
+			logger.propagate = False
 		logger.setLevel(logging.INFO)
 		return logger
 
+	###################################
+	# Downloads, converts and compares the roster, emailing any changes
+	# Can be called repeatedly, e.g. by watch.Watcher. The latest roster is
+	# kept in memory, so later calls diff against it rather than re-loading it
+	# Returns True if processing completed, or False if it failed
+	###################################
 	def process(self):
 
+		self._metrics = metrics.Metrics(self._source, self._logpath + METRICSFILE, self._metricsHook)
+		ok = False
 		try:
+			self._setDate(datetime.date.today())
 			self._log.info("Processing roster for " + datetime.datetime.now().strftime("%d/%m/%Y") + "...")
 			self._log.info("===========================================================")
 			self._log.info("Current path is: " + self._httppath)
 			self._log.info("Downloading...")
-			if self._download():
+			with self._metrics.span('download') as span:
+				downloaded = self._download()
+				span['bytes'] = self._bytes
+			if downloaded is None:
+				raise Exception("Unable to download " + self._httppath)
+			if downloaded:
 				self._log.info("Comparing " + self._name + " roster against existing versions...")
-				if self._locateLastFile(self._xlsxpath, ROSTERNAME, self._excelxtn) and self._compareFiles(self._xlsxfull,self._locateLastFile(self._xlsxpath, ROSTERNAME, self._excelxtn)):
+				if self._notModified:
+					self._log.info("Server reports no changes to roster since last download. No further actions required.")
+				elif self._compareDigests():
 					self._log.info("No changes to roster since last download. Removing downloaded file: " + self._name + self._excelxtn)
-					os.remove(self._xlsxfull)
+					os.remove(self._partfull)
+					if self._lastFile:
+						self._manifest.update(self._lastFile, **self._fetched)
 					self._log.info("File deleted. No further actions required.")
 				else:
 					self._log.info("Downloaded file is newer than the last available version.")
+					lastRoster = self._lastRoster
+					if lastRoster is None and self._replacing:
+						lastRoster = self._loadReplacedRoster()
 					self._log.info("Converting to *.csv")
-					self._convert()
+					with self._metrics.span('convert') as span:
+						currentRoster = self._convert()
+						span['rows'] = len(currentRoster) if currentRoster is not None else 0
+					if currentRoster is None:
+						os.remove(self._partfull)		#Downloaded again on the next run
+						raise Exception("Unable to convert " + self._name + self._excelxtn + ", the last download has been kept")
+					self._saveDownload()
 
 					self._log.info("Emailing latest versions..")
-					currentRoster = roster.Roster(self._csvfull)
-					prevRoster = roster.Roster(self._locateLastFile(self._csvpath, ROSTERNAME, self._csvxtn))
 					today = datetime.datetime.now().strftime("%d/%m/%Y")
 					fortnite = (datetime.datetime.now() + datetime.timedelta(days=14)).strftime("%d/%m/%Y")
-					self._log.info("Resources allocated, looping...")
-					for key in self._recips:
-						if currentRoster.showMemberPeriod(key,today,fortnite) == prevRoster.showMemberPeriod(key,today,fortnite):
-							self._log.info("{0} is the same in both rosters between {1} and {2}. Skipping...".format(key, today, fortnite))
+					with self._metrics.span('previous', cached=lastRoster is not None) as span:
+						prevRoster = lastRoster if lastRoster is not None else self._loadLastRoster(today, fortnite)
+						span['rows'] = len(prevRoster) if prevRoster is not None else 0
+					self._lastRoster = currentRoster
+					with self._metrics.span('diff', recipients=len(self._recips)) as span:
+						changed = []
+						if prevRoster is None:
+							self._log.info("No previous roster to compare against. Skipping...")
+							span['changes'] = 0
+							span['changed'] = 0
 						else:
-							self._log.info("{0} is different between {1} and {2}. Emailing to {3}...".format(key, today, fortnite,str(self._recips[key])))
-							self._email(key,self._recips[key],currentRoster.showMemberPeriod(key,today,fortnite),prevRoster.showMemberPeriod(key,today,fortnite))
+							import diff
+							changes = diff.Diff(prevRoster,currentRoster,today,fortnite)
+							self._log.info("Resources allocated, {0} changed shifts found. Looping...".format(len(changes)))
+							for key in self._recips:
+								if not changes.changed(key):
+									self._log.info("{0} is the same in both rosters between {1} and {2}. Skipping...".format(key, today, fortnite))
+								else:
+									self._log.info("{0} is different between {1} and {2}. Emailing to {3}...".format(key, today, fortnite,str(self._recips[key])))
+									changed.append((key,changes.showCurrent(key),changes.showPrevious(key)))
+							span['changes'] = len(changes)
+							span['changed'] = len(changed)
+					with self._metrics.span('render') as span:
+						bodies = self._getTemplate().renderAll(changed)
+						for key,current,previous in changed:
+							self._email(key,self._recips[key],bodies[key])
+						span['emails'] = len(self._outbox)
+					with self._metrics.span('send') as span:
+						results = self._sendEmails()
+						span['sent'] = sum(1 for error in results.values() if error is None)
+						span['failed'] = len(results) - span['sent']
 			else:
 				self._log.info("File '" + self._name + "' already exists!")
 				self._log.info("Aborting file conversion...")
@@ -110,84 +239,164 @@ class Roster:
 				self._log.info(self._xlsxfull)
 			self._log.info("===========================================================")
 			self._log.info("Processing complete!")
+			ok = True
+			return True
 
 		except Exception as e:
 			self._log.error("##################")
 			self._log.error("PROCESSING FAILED!")
 			self._log.error("##################")
 			self._log.error(str(e))
+			return False
+
+		finally:
+			self._emitMetrics(ok)
 
 	###################################
 	# Downloads a copy of the xlsx roster
-	# Saves as './downloaded/rosterYYYYMMDD.xlsx'
+	# Saves as './downloaded/rosterYYYYMMDD.xlsx.part' until self._saveDownload()
+	# In watch mode a roster already downloaded today is checked again, and is
+	# replaced if the server's copy has changed since
+	# Sends the ETag/Last-Modified of the last download, and
+	# treats a '304 Not Modified' response as an unchanged roster
+	# The MD5 checksum is calculated while the file streams to disk
 	###################################
 	def _download(self):
 
 		try:
 			if os.path.isfile(self._xlsxfull):
-				return False
-			user = raw_input("Please enter username: ")
-			#user = AUTHUSER
-			pwd = getpass("Please enter password for '" + user + "': ")
-			#pwd = AUTHPASS
-			r = requests.get(self._httppath, auth=(user,pwd), verify=False, stream=True)
+				if not self._watch:
+					return False
+				self._replacing = True
+			import hashlib
+			from getpass import getpass
+			import requests
+			from requests.packages.urllib3.exceptions import InsecureRequestWarning
+			requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
+
+			if self._auth:
+				user, pwd = self._auth
+			else:
+				user = input("Please enter username: ")
+				#user = AUTHUSER
+				pwd = getpass("Please enter password for '" + user + "': ")
+				#pwd = AUTHPASS
+			self._lastFile = self._locateLastFile(self._excelxtn, self._replacing)
+			last = self._manifest.entry(self._lastFile) if self._lastFile else {}
+			self._lastDigest = self._manifest.digest(self._lastFile) if self._lastFile else None
+			headers = {}
+			if last.get('etag'):
+				headers['If-None-Match'] = last['etag']
+			if last.get('modified'):
+				headers['If-Modified-Since'] = last['modified']
+			r = requests.get(self._httppath, auth=(user,pwd), headers=headers, verify=False, stream=True)
+			if r.status_code == requests.codes.not_modified:
+				self._log.info("Credentials good, roster not modified since the last download.")
+				self._notModified = True
+				return True
 			if r.status_code != requests.codes.ok:
 				raise Exception("Unable to download file. Check credentials and connectivity")
 			self._log.info("Credentials good, downloading...")
-			r.raw.decode_content = True
 
-			with open(self._xlsxfull,'wb') as out_file:
-				shutil.copyfileobj(r.raw,out_file)
+			checksum = hashlib.md5()
+			with open(self._partfull,'wb') as out_file:
+				for chunk in r.iter_content(chunk_size=CHUNKSIZE):
+					checksum.update(chunk)
+					self._bytes += len(chunk)
+					out_file.write(chunk)
 				self._log.info(self._name + self._excelxtn + " downloaded successfully!")
-				return True
+			self._digest = checksum.hexdigest()
+			self._fetched = {'etag':r.headers.get('ETag'),'modified':r.headers.get('Last-Modified')}
+			return True
 		except Exception as e:
 			self._log.error("Something broke while trying to download: " + str(e))
 
 	###################################
-	# Converts the xlsx file to a csv format
-	# Saves as './converted/rosterYYYYMMDD.csv'
+	# Keeps a changed download as './downloaded/rosterYYYYMMDD.xlsx'
+	# Replaces today's earlier download, if there is one
+	###################################
+	def _saveDownload(self):
+		os.replace(self._partfull, self._xlsxfull)
+		self._manifest.add(self._xlsxfull, self._date, self._digest, **self._fetched)
+
+	###################################
+	# Converts the downloaded xlsx file to a csv format, before it is saved
+	# Saves as './converted/rosterYYYYMMDD.csv', keeping any earlier CSV
+	# until the whole worksheet has been read
+	# Returns the roster built from the same pass over the worksheet,
+	# or None if the download could not be converted
 	###################################
 	def _convert(self):
+		partcsv = self._csvfull + ".part"
 		try:
-			wb = xlrd.open_workbook(self._xlsxfull)
-			sh = wb.sheet_by_name(WORKSHEET)
-
-			with open(self._csvfull,'w') as new_csv:
-				wr = csv.writer(new_csv, quoting=csv.QUOTE_ALL)
-				for row in range(sh.nrows):
-					wr.writerow(sh.row_values(row))
-				self._log.info("CSV written to: " + self._csvfull)
+			import roster
+			current = roster.Roster.fromWorkbook(self._partfull, self._worksheet, partcsv, storage='matrix')
+			os.replace(partcsv, self._csvfull)
+			self._log.info("CSV written to: " + self._csvfull)
+			self._manifest.add(self._csvfull, self._date)
+			try:
+				current.saveSnapshot(self._snapfull)
+				self._manifest.add(self._snapfull, self._date)
+				self._log.info("Snapshot written to: " + self._snapfull)
+			except Exception as e:
+				self._log.error("Unable to write snapshot " + self._snapfull + " " + str(e))
+			return current
 
 		except Exception as e:
 			self._log.error("Something broke, are all the file and path names correct?")
 			self._log.error(str(e))
+			if os.path.isfile(partcsv):
+				os.remove(partcsv)
+
+	###################################
+	# Loads the last converted roster
+	# Memory-maps its snapshot where one exists, otherwise reads just the
+	# rows between start and finish from its CSV, via the CSV's row index
+	# A snapshot that cannot be read (e.g. truncated) is logged and skipped
+	# Returns None if there is no previous roster
+	###################################
+	def _loadLastRoster(self, start, finish):
+		import roster
+
+		lastsnap = self._locateLastFile(self._snapxtn)
+		if lastsnap:
+			try:
+				return roster.Roster.fromSnapshot(lastsnap)
+			except Exception as e:
+				self._log.error("Unable to read snapshot " + lastsnap + ", reading the CSV instead: " + str(e))
+		lastcsv = self._locateLastFile(self._csvxtn)
+		if lastcsv:
+			return roster.Roster.fromIndex(lastcsv, start, finish, storage='matrix')
+
+	###################################
+	# Loads today's converted roster before a changed download replaces it,
+	# so the changes are compared against it rather than yesterday's roster
+	# Returns None if it cannot be read
+	###################################
+	def _loadReplacedRoster(self):
+		import roster
+
+		if not os.path.isfile(self._csvfull):
+			return None
+		try:
+			return roster.Roster(self._csvfull, storage='matrix')
+		except Exception as e:
+			self._log.error("Unable to read " + self._csvfull + ": " + str(e))
 
 	###################################
 	# Will email a copy of both the xlsx and csv files to a nominated address
+	# The body is rendered by self._template, in one batch for all recipients
+	# Emails are queued and sent together by self._sendEmails()
 	###################################
-	def _email(self,name,address,current,previous):
-		send_from = FROMEMAIL
-		data = self._buildHTMLTable(name,current,previous)
-		body = "Hey, {0}!".format(name)
-		body += """<br><br>The roster has been updated recently and my little scripty thing has found that your upcoming shifts have changed!
-<br><br>Below is a table of your upcoming shifts and the aforementioned changes:<br><br>"""
-		body += data
-		body += """
-<br>If you want to double-check these shifts, please see the current version of the roster here:"""
-body += "<br><a href='" + FILEURL + "'>" + FILEURL + "</a>"
-body += """
-
-<br><br>To stop receiving these emails, simply reply 'STOP!', and nothing will happen.
-Then come over and ask me to remove you from this mailing list and I'll think about it ;)
-Also, if you want this sent to a different email address, let me know.
-
-<br><br>With love ('n' stuff),
-<br>Me.""".format(name)
+	def _email(self,name,address,body):
+		from email.mime.multipart import MIMEMultipart
+		from email.mime.text import MIMEText
 
+		send_from = FROMEMAIL
 		files = [self._xlsxfull,self._csvfull]
 
 		try:
-			self._log.info("Sending email to '" + str(address) + "'...")
+			self._log.info("Queueing email to '" + str(address) + "'...")
 			msg = MIMEMultipart()
 			msg['From'] = send_from
 			msg['To'] = ", ".join(address)
@@ -203,73 +412,73 @@ Also, if you want this sent to a different email address, let me know.
 			#	part['Content-Disposition'] = 'attachment; filename="%s"' % f
 			#	msg.attach(part)
 
-			smtp = smtplib.SMTP(MAILSERVER)
-			smtp.sendmail(send_from, address, msg.as_string())
-			smtp.close()
-			self._log.info("Email sent successfully!")
+			self._outbox.append((name, send_from, address, msg.as_string()))
 		except Exception as e:
-			self._log.error("Failed to send email: " + str(e))
+			self._log.error("Failed to build email: " + str(e))
 
 	###################################
-	# Returns the MD5 checksum of the file
-	# Used to check the file against previous versions
+	# Sends every queued email over pooled connections to the mail server
+	# Logs and returns the result for each recipient
 	###################################
-	def _getChecksum(self,path):
-		try:
-			with open(path, "rb") as checkfile:
-				data = checkfile.read()
-				return hashlib.md5(data).hexdigest()
-
-		except Exception as e:
-			self._log.error("Unable to open " + path + " " + str(e))
+	def _sendEmails(self):
+		if not self._outbox:
+			return {}
+		self._log.info("Sending " + str(len(self._outbox)) + " email(s) via " + MAILSERVER + "...")
+		import notify
+		with notify.Mailer(MAILSERVER) as mailer:		#Pool sizes as per notify.MAILCONNECTIONS and notify.MAILWORKERS
+			results = mailer.sendAll(self._outbox)
+		for name, send_from, address, message in self._outbox:
+			if results[name] is None:
+				self._log.info("Email to '" + str(address) + "' sent successfully!")
+			else:
+				self._log.error("Failed to send email to '" + str(address) + "': " + results[name])
+		self._outbox = []
+		return results
 
 	###################################
 	# Attempts to locate the last file following the requested naming convention
+	# Looks up the archive manifest rather than probing the folders day by day
+	# Files from before today are found, or up to and including today if current is True
 	###################################
-	def _locateLastFile(self, folder, name, xtn):
-		count = 1
-		date = datetime.datetime.now()
-		while True:
-			try:
-				otherfile = folder + name + (date - datetime.timedelta(days=count)).strftime("%Y%m%d") + xtn
-				if os.path.isfile(otherfile):
-					self._log.info("Found: " + otherfile)
-					return otherfile
-				elif count == 28:
-					self._log.info("Unable to locate a file within the last 28-days.")
-					return False
-				else:
-					#print(otherfile + " does not exist. Trying previous day...")
-					count = count + 1
-			except Exception as e:
-				self._log.error("An error occurred when attempting to locate the last file: " + str(e))
+	def _locateLastFile(self, xtn, current=False):
+		if current:
+			entry = self._manifest.asOf(xtn, self._date)
+		else:
+			entry = self._manifest.latest(xtn, before=self._date)
+		if entry:
+			self._log.info("Found: " + entry['path'])
+			return entry['path']
+		self._log.info("Unable to locate a previous " + xtn + " file.")
+		return False
 
 	###################################
-	# Compares the MD5 Checksum of two files
+	# Compares the MD5 Checksum of the download against the last download
+	# Both checksums come from the manifest, so neither file is re-read
+	###################################
+	def _compareDigests(self):
+		return self._digest is not None and self._digest == self._lastDigest
+
 	###################################
-	def _compareFiles(self,file1,file2):
+	# Writes the stage timings and counts of the run to METRICSFILE and METRICSHOOK
+	# A failure to record metrics is logged, but does not fail the run
+	###################################
+	def _emitMetrics(self,ok):
 		try:
-			#print(self._getChecksum(file1))
-			#print(self._getChecksum(file2))
-			if self._getChecksum(file1) == self._getChecksum(file2):
-				return True
-			else:
-				return False
-		except:
-			return False
+			self._metrics.emit(ok)
+		except Exception as e:
+			self._log.error("Unable to record metrics: " + str(e))
 
+	###################################
+	# Returns the email template, building it the first time it is needed
+	###################################
+	def _getTemplate(self):
+		if self._template is None:
+			import render
+			self._template = render.Template(self._httppath)
+		return self._template
+
+	###################################
+	# Returns the HTML table of a staff member's previous and current shifts
+	###################################
 	def _buildHTMLTable(self,key,current,previous):
-		table = """
-<style>
-table, tr, th, td {
- border: 1px solid black;
- border-collapse: collapse;
- text-align: center;
-}
-</style>
-<table>
-		<tr><th style='width: 150px;'>Date</th><th style='width: 150px;'>Previous Shift</th><th style='width: 150px;'>New Shift</th></tr>"""
-		for day in sorted(current[key].keys(), key=lambda k: (k[:2:-1],k[:2])):	#Sorts by YYYY/MM then DD
-			table += "<tr><td>{0}</td><td>{1}</td><td>{2}</td></tr>".format(day,previous[key][day],current[key][day])
-		table += "</table>"
-		return table
+		return self._getTemplate().table(key,current,previous)
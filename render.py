@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+
+#########
+# GLOBALS
+#########
+GREETING = "Hey, {name}!"
+INTRO = """<br><br>The roster has been updated recently and my little scripty thing has found that your upcoming shifts have changed!
+<br><br>Below is a table of your upcoming shifts and the aforementioned changes:<br><br>"""
+TABLEHEAD = """
+<style>
+table, tr, th, td {
+ border: 1px solid black;
+ border-collapse: collapse;
+ text-align: center;
+}
+</style>
+<table>
+		<tr><th style='width: 150px;'>Date</th><th style='width: 150px;'>Previous Shift</th><th style='width: 150px;'>New Shift</th></tr>"""
+TABLEROW = "<tr><td>{0}</td><td>{1}</td><td>{2}</td></tr>"
+TABLETAIL = "</table>"
+OUTRO = """
+<br>If you want to double-check these shifts, please see the current version of the roster here:<br><a href='{url}'>{url}</a>
+
+<br><br>To stop receiving these emails, simply reply 'STOP!', and nothing will happen.
+Then come over and ask me to remove you from this mailing list and I'll think about it ;)
+Also, if you want this sent to a different email address, let me know.
+
+<br><br>With love ('n' stuff),
+<br>Me."""
+
+#//////////////////////////////////////////////////////////////////
+# CLASS: Template
+# Renders the HTML body of the roster change emails
+# Everything that is the same for each recipient is built once, and each
+# body is joined from its parts rather than concatenated row by row
+#
+# Parameter(s):
+#	url: The web URL of the roster, linked at the end of each email
+#	-- Datatype: String
+#//////////////////////////////////////////////////////////////////
+class Template:
+	def __init__(self,url):
+		self.__greeting = GREETING.split("{name}")
+		self.__middle = self.__greeting[1] + INTRO + TABLEHEAD
+		self.__tail = TABLETAIL + OUTRO.format(url=url)
+		self.__row = TABLEROW.format
+
+#//////////////////////////////////////////////////////////////////
+# PUBLIC FUNCTIONS
+# Callable by program to render the emails
+#//////////////////////////////////////////////////////////////////
+	def table(self,key,current,previous):
+		return "".join(self.__table([TABLEHEAD],key,current,previous,TABLETAIL))
+
+	def body(self,key,current,previous):
+		return "".join(self.__body(key,current,previous))
+
+	def renderAll(self,changes):
+		return self.__renderAll(changes)
+
+#//////////////////////////////////////////////////////////////////
+# SECONDARY FUNCTIONS
+# Called by the public functions to build the HTML
+#//////////////////////////////////////////////////////////////////
+	# FUNCTION: self.__table
+	# Appends a row per date of the current period to a list of HTML parts
+	#
+	# Parameter(s):
+	#	parts: HTML parts to append to
+	#	-- Datatype: Array of Strings
+	#	key: Staff name of the periods
+	#	-- Datatype: String
+	#	current,previous: Periods as returned by roster.Roster.showMemberPeriod()
+	#	-- Datatype: Dictionary of {'StaffName':{'DD/MM/YYYY':'Shift'}}
+	#	tail: HTML to append after the rows
+	#	-- Datatype: String
+	# Returns:
+	#	The array of HTML parts
+	#//////////////////////////////////////////////////////////
+	def __table(self,parts,key,current,previous,tail):
+		row = self.__row
+		new = current[key]
+		old = previous[key]
+		parts.extend([row(day,old.get(day,''),new[day]) for day in new])
+		parts.append(tail)
+		return parts
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__body
+	# Returns the HTML parts of one email body
+	#//////////////////////////////////////////////////////////
+	def __body(self,key,current,previous):
+		return self.__table([self.__greeting[0],str(key),self.__middle],key,current,previous,self.__tail)
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__renderAll
+	# Renders the email body of every recipient in one batch
+	#
+	# Parameter(s):
+	#	changes: (key, current, previous) tuples for each recipient
+	#	-- Datatype: Array
+	# Returns:
+	#	Dictionary of {key:'HTML body'}
+	#//////////////////////////////////////////////////////////
+	def __renderAll(self,changes):
+		join = "".join
+		return dict((key,join(self.__body(key,current,previous))) for key,current,previous in changes)
@@ -2,17 +2,30 @@
 
 import datetime
 import csv
-import re
+import itertools
 
+import coverage
+import dates
 import day
+import export
+import intervals
+import matrix
 import person
+import rowindex
 import shifts
+import snapshot
+import xlsx
 
 #########
 # GLOBALS
 #########
 CSVDIALECT = 'excel'
+CSVQUOTING = csv.QUOTE_ALL	#Quoting used when writing a CSV copy of a workbook
 DEFAULTNEWSHIFT = 'Off'
+DEFAULTSTORAGE = 'days'
+LOADROWS = 1024		#Rows converted at a time while loading
+STORAGE = {'days':day.Days,		#One Day/Person/Shift Object per cell
+	'matrix':matrix.Matrix}		#Flat array of shift codes per cell
 
 #//////////////////////////////////////////////////////////////////
 # CLASS: Roster
@@ -21,16 +34,90 @@ DEFAULTNEWSHIFT = 'Off'
 # Parameters:
 #	csvfile: File location of the CSV to convert
 #	-- Datatype: String
+#	storage: Optional. Name of the storage engine to hold the roster in
+#		'days' - Day, Person and Shift Objects for each cell (default)
+#		'matrix' - Compact matrix of shift codes, for large rosters
+#	-- Datatype: String
 #//////////////////////////////////////////////////////////////////
 class Roster:
-	def __init__(self,csvfile):
-		self.__roster = self.__returnArray(csvfile)
-		self.__headers = self.__roster[0]
-		self.__days = self.__buildRoster(self.__roster)
+	def __init__(self,csvfile,storage=DEFAULTSTORAGE):
+		self.__load(self.__returnArray(csvfile),storage)
 
 	def __getitem__(self,day):
 		return self.showDay(day)
 
+	def __len__(self):
+		return len(self.__days.dates())
+
+	#//////////////////////////////////////////////////////////
+	# CONSTRUCTOR: Roster.fromWorkbook
+	# Creates a Roster straight from a worksheet of an Excel workbook
+	# Skips writing and re-reading a CSV, although a CSV copy can still be
+	# written from the same pass over the sheet
+	#
+	# Parameter(s):
+	#	xlsxfile: File location of the workbook
+	#	-- Datatype: String
+	#	worksheet: Name of the worksheet containing the roster
+	#	-- Datatype: String
+	#	csvfile: Optional. File location to write a CSV copy of the worksheet to
+	#	-- Datatype: String
+	#	storage: Optional. Name of the storage engine, as per Roster()
+	#	-- Datatype: String
+	# Returns:
+	#	Roster Object
+	#//////////////////////////////////////////////////////////
+	@classmethod
+	def fromWorkbook(cls,xlsxfile,worksheet,csvfile=None,storage=DEFAULTSTORAGE):
+		self = cls.__new__(cls)
+		self.__load(self.__readWorkbook(xlsxfile,worksheet,csvfile),storage)
+		return self
+
+	#//////////////////////////////////////////////////////////
+	# CONSTRUCTOR: Roster.fromIndex
+	# Opens a converted CSV through its row index (see rowindex.py), parsing only
+	# the rows that are used rather than the whole file
+	# With a date range, only the rows of those dates are loaded (windowed)
+	# Without one, every date is known but each row is parsed the first time it
+	# is queried (lazy)
+	#
+	# Parameter(s):
+	#	csvfile: File location of the CSV, indexed on first use
+	#	-- Datatype: String
+	#	xstart,xfinish: Optional. First and last dates of the window to load, in either order
+	#		Without xfinish, only xstart is loaded
+	#	-- Datatype: String, or Python datetime.date Object
+	#	storage: Optional. Name of the storage engine, as per Roster()
+	#	-- Datatype: String
+	# Returns:
+	#	Roster Object
+	#//////////////////////////////////////////////////////////
+	@classmethod
+	def fromIndex(cls,csvfile,xstart=None,xfinish=None,storage=DEFAULTSTORAGE):
+		self = cls.__new__(cls)
+		self.__loadIndex(rowindex.load(csvfile),xstart,xfinish,storage)
+		return self
+
+	#//////////////////////////////////////////////////////////
+	# CONSTRUCTOR: Roster.fromSnapshot
+	# Opens a binary snapshot written by Roster.saveSnapshot()
+	# The snapshot is memory-mapped rather than parsed, using 'matrix' storage
+	#
+	# Parameter(s):
+	#	snapfile: File location of the snapshot
+	#	-- Datatype: String
+	# Returns:
+	#	Roster Object
+	#//////////////////////////////////////////////////////////
+	@classmethod
+	def fromSnapshot(cls,snapfile):
+		self = cls.__new__(cls)
+		self.__days = snapshot.load(snapfile)
+		self.__headers = ['Date'] + self.__days.staff()
+		self.__coverage = None
+		self.__intervals = None
+		return self
+
 #//////////////////////////////////////////////////////////////////
 # PUBLIC FUNCTIONS
 # Callable by program to view/manipulate the class
@@ -39,14 +126,13 @@ class Roster:
 	#
 	#//////////////////////////////////////////////////////////
 	def showDay(self,xdate):
-		day = self.__convertDate(xdate).strftime('%d/%m/%Y')
-		return self.__days[day].working()
+		return self.__days.working(self.__convertDate(xdate))
 
 	def showPeriod(self, xstart, xfinish):
-		arr = {}
-		for n in range(1,len(self.__headers)):
-			arr.update(self.__showMemberPeriod(self.__headers[n], xstart, xfinish))
-		return arr
+		return self.__showTable(self.query(xstart,xfinish))
+
+	def query(self,xstart,xfinish,xstaff=None):
+		return self.__query(xstart,xfinish,xstaff)
 
 	def showMember(self, xstaff):
 		return self.__showMember(xstaff)
@@ -54,9 +140,30 @@ class Roster:
 	def showMemberPeriod(self, xstaff, xstart, xfinish):
 		return self.__showMemberPeriod(xstaff, xstart, xfinish)
 
+	def showHours(self,xstart,xfinish,xstaff=None):
+		return self.__showHours(xstart,xfinish,xstaff)
+
 	def showShift(self,xdate,xstaff):
-		day = self.__convertDate(xdate).strftime('%d/%m/%Y')
-		return self.__days[day].returnShift(xstaff)
+		return self.__days.shift(self.__convertDate(xdate),xstaff)
+
+	def onShift(self,xdate,xshift):
+		return sorted(self.__getCoverage().onShift(self.__convertDate(xdate),xshift))
+
+	def headcount(self,xdate,xshift=None):
+		return self.__headcount(self.__convertDate(xdate),xshift)
+
+	def showCoverage(self,xstart,xfinish,xshift=None):
+		return self.__showCoverage(xstart,xfinish,xshift)
+
+	def understaffed(self,xstart,xfinish,minimums):
+		return self.__understaffed(xstart,xfinish,minimums)
+
+	def workingAt(self,xtime):
+		return self.__getIntervals().at(self.__convertTime(xtime))
+
+	def workingBetween(self,xstart,xfinish):
+		start,finish = sorted([self.__convertTime(xstart),self.__convertTime(xfinish)])
+		return self.__getIntervals().between(start,finish)
 
 	def addMember(self,xstaff,**xdefault):
 		if 'default' in xdefault:
@@ -68,13 +175,32 @@ class Roster:
 	def removeMember(self,xstaff):
 		self.__removeMember(xstaff)
 
+	def saveSnapshot(self,snapfile):
+		snapshot.write(self.__asMatrix(),snapfile)
+
+	def exportRows(self):
+		return export.rows(self.__days)
+
+	def exportShifts(self,xstart=None,xfinish=None,xstaff=None):
+		return self.__exportShifts(xstart,xfinish,xstaff)
+
+	def writeCSV(self,fileobj):
+		export.writeCSV(export.rows(self.__days),fileobj)
+
+	def writeCalendar(self,fileobj,xstart=None,xfinish=None,xstaff=None,name=export.CALENDARNAME):
+		export.writeCalendar(self.__exportShifts(xstart,xfinish,xstaff),fileobj,name)
+
+	def writeGoogleCalendar(self,fileobj,xstart=None,xfinish=None,xstaff=None):
+		export.writeCSV(export.google(self.__exportShifts(xstart,xfinish,xstaff)),fileobj)
+
 	def updateShift(self,xstaff,xshift,xdate):
-		self.__updateShift(xstaff,xdate,day)
+		return self.__updateShift(xstaff,xshift,xdate)
 
 	def updateShiftBatch(self,xstaff,xshift,xdate, ydate):
-		dates = self.__getDateRange(xdate,ydate)
-		for day in dates:
-			updateShift(xstaff,xshift,day)
+		return self.__updateShifts([(xstaff,xdate,ydate,xshift)])
+
+	def updateShifts(self,edits):
+		return self.__updateShifts(edits)
 
 #//////////////////////////////////////////////////////////////////
 # CORE FUNCTIONS
@@ -101,6 +227,77 @@ class Roster:
 			print("Unable to open CSV file:")
 			print(str(e))
 
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__readWorkbook
+	# Yields each row of a worksheet of an Excel workbook, as it is read from the file
+	# Optionally writes each row to a CSV file as it is read
+	#
+	# Parameter(s):
+	#	xlsxfile: The filepath to the desired workbook
+	#	-- Datatype: String
+	#	worksheet: The name of the worksheet to read
+	#	-- Datatype: String
+	#	csvfile: Filepath of the CSV copy to write, or None
+	#	-- Datatype: String
+	# Yields:
+	#	Array of each column of the row, as per self.__returnArray()
+	#//////////////////////////////////////////////////////////
+	def __readWorkbook(self,xlsxfile,worksheet,csvfile):
+		rows = xlsx.rows(xlsxfile,worksheet)
+		if not csvfile:
+			yield from rows
+			return
+		with open(csvfile,'w') as new_csv:
+			writer = csv.writer(new_csv, quoting=CSVQUOTING)
+			for row in rows:
+				writer.writerow(row)
+				yield row
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__load
+	# Populates the Roster from the header row followed by each day
+	#
+	# Parameter(s):
+	#	rows: 2D array, or rows yielded as they are read
+	#	-- Datatype: Array, or Iterable of Arrays
+	#	storage: Name of the storage engine
+	#	-- Datatype: String
+	#//////////////////////////////////////////////////////////
+	def __load(self,rows,storage):
+		rows = iter(rows)
+		self.__headers = next(rows)
+		self.__days = self.__buildRoster(self.__headers,rows,storage)
+		self.__coverage = None		#Built by self.__getCoverage() when first needed
+		self.__intervals = None		#Built by self.__getIntervals() when first needed
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__loadIndex
+	# Populates the Roster from the row index of a CSV
+	#
+	# Parameter(s):
+	#	index: Row index of the CSV
+	#	-- Datatype: rowindex.RowIndex Object
+	#	xstart,xfinish: First and last dates of the window, or None to load lazily
+	#	-- Datatype: String, or Python datetime.date Object
+	#	storage: Name of the storage engine
+	#	-- Datatype: String
+	#//////////////////////////////////////////////////////////
+	def __loadIndex(self,index,xstart,xfinish,storage):
+		if storage not in STORAGE:
+			raise Exception("Unknown storage engine '" + str(storage) + "'")
+		self.__headers = index.headers()
+		if xstart is None:
+			self.__days = rowindex.Lazy(index,STORAGE[storage])
+		else:
+			start,finish = self.__getPeriod(xstart,xstart if xfinish is None else xfinish)
+			self.__days = STORAGE[storage](self.__headers[1:])		#Skip the date header
+			lo,hi = index.bounds(start,finish)
+			for date,row in index.rows(lo,hi):
+				self.__days.append(date,row[1:])
+			index.close()
+		self.__coverage = None
+		self.__intervals = None
+
 	#//////////////////////////////////////////////////////////
 	# FUNCTION: self.__getIndex
 	# Gets the column index of a string from the desired array
@@ -122,103 +319,137 @@ class Roster:
 
 	#//////////////////////////////////////////////////////////
 	# FUNCTION: self.__buildRoster
-	# Converts the 2D array into a Dictionary Object
+	# Converts the rows of each day into the nominated storage engine
+	# Dates are converted LOADROWS rows at a time, so rows yielded from a
+	# workbook are never all held at once
 	#
 	# Parameter(s):
-	#	arr: 2D array returned from self.__returnArray()
+	#	headers: Header row, as per self.__returnArray()
 	#	-- Datatype: Array
+	#	rows: Each row following the headers
+	#	-- Datatype: Iterable of Arrays
+	#	storage: Key of the storage engine within the STORAGE global
+	#	-- Datatype: String
 	# Returns:
-	#	Dictionary of Day classes with embedded Person and Shift classes
-	#	-- roster['DD/MM/YYYY']['StaffName']['Shift']
-	#//////////////////////////////////////////////////////////
-	def __buildRoster(self,arr):
-		roster = {}
-		for n in range(1,len(arr)):			#Skip the headers
-			try:
-				date = self.__convertDate(arr[n][0])
-				shifts = self.__appendShiftsToStaff(arr[n],self.__headers)
-				roster[date.strftime('%d/%m/%Y')] = day.Day(date,shifts)
-			except Exception as e:
-				#print("Failed to parse date '%s'" % arr[n][0])
-				#print(str(e))
-				continue
+	#	Storage engine Object (day.Days or matrix.Matrix) holding each row by date
+	#	-- roster.shift(date,'StaffName')
+	#//////////////////////////////////////////////////////////
+	def __buildRoster(self,headers,rows,storage):
+		if storage not in STORAGE:
+			raise Exception("Unknown storage engine '" + str(storage) + "'")
+		roster = STORAGE[storage](headers[1:])		#Skip the date header
+		chunk = list(itertools.islice(rows,LOADROWS))
+		while chunk:
+			column = dates.convertColumn([row[0] if row else '' for row in chunk])
+			for n in range(0,len(chunk)):
+				try:
+					date = column[n]
+					if date is None:
+						continue
+					roster.append(date,chunk[n][1:])
+				except Exception as e:
+					#print("Failed to parse date '%s'" % chunk[n][0])
+					#print(str(e))
+					continue
+			chunk = list(itertools.islice(rows,LOADROWS))
 		return roster
 
 	#//////////////////////////////////////////////////////////
-	# FUNCTION: self.__appendShiftsToStaff
-	# Called by self.__buildRoster to convert array rows into a dict
+	# FUNCTION: self.__convertDate
+	# Converts a date string to a date object via the dates module
 	#
 	# Parameter(s):
-	#	row: A row of shifts to be associated with headers
-	#	-- Datatype: Array
-	#	headers: Header cells to be associated with each corresponding column of the row
-	#	-- Datatype: Array
+	#	xdate: Date string to match against
+	#	-- Datatype: String, or Python datetime.date Object
 	# Returns:
-	#	A dictionary of row columns associated with corresponding headers
-	#	{'HeaderA':'RowA', 'HeaderB':'RowB', 'HeaderC':'RowC'}
+	#	Python datetime.date Object
 	#//////////////////////////////////////////////////////////
-	def __appendShiftsToStaff(self,row,headers):
-		shifts = {}
-		for n in range(1,len(row)):			#Skip the date header
-			shifts[headers[n]] = row[n]
-		return shifts
+	def __convertDate(self,xdate):
+		return dates.convert(xdate)
 
 	#//////////////////////////////////////////////////////////
-	# FUNCTION: self.__convertDate
-	# Regex matches a date string and converts to datetime object
+	# FUNCTION: self.__convertTime
+	# Converts a datetime, or a date at midnight, to a datetime object
 	#
 	# Parameter(s):
-	#	xdate: Date string to match against
-	#	-- Datatype: String
+	#	xtime: Date and time to convert
+	#	-- Datatype: Python datetime.datetime Object, or any date accepted by self.__convertDate()
 	# Returns:
 	#	Python datetime.datetime Object
 	#//////////////////////////////////////////////////////////
-	def __convertDate(self,xdate):
-		d = self.REMatcher(xdate)
-		if d.match('([0-2][0-9]|3[0-1])[\/\-](0[1-9]|1[0-2])[\/\-](20[0-2][0-9])'):	#DD-MM-YYYY Format
-			#print(datetime.date(d.group(3),d.group(2),d.group(1)))
-			return datetime.date(int(d.group(3)),int(d.group(2)),int(d.group(1)))
-		elif d.match('(20[0-2][0-9])[\/\-](0[1-9]|1[0-2])[\/\-]([0-2][0-9]|3[0-1])'):	#YYYY-MM-DD Format
-			#print(datetime.date(d.group(1),d.group(2),d.group(3)))
-			return datetime.date(int(d.group(1)),int(d.group(2)),int(d.group(3)))
-		elif d.match('([3-5][0-9]{4})'):							#Excel number format
-			#print(self.__getExcelDate(d.group(1)))
-			return self.__getExcelDate(int(d.group(1)))
-		else:
-			pass
+	def __convertTime(self,xtime):
+		if isinstance(xtime,datetime.datetime):
+			return xtime
+		return datetime.datetime.combine(self.__convertDate(xtime),datetime.time(0))
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__asMatrix
+	# Returns the roster's storage as a matrix.Matrix, converting it if required
+	#//////////////////////////////////////////////////////////
+	def __asMatrix(self):
+		if isinstance(self.__days,matrix.Matrix):
+			return self.__days
+		staff = self.__days.staff()
+		converted = matrix.Matrix(staff)
+		for day in self.__days.dates():
+			working = self.__days.working(day)
+			converted.append(day,[working.get(name,matrix.BLANKSHIFT) for name in staff])
+		return converted
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__getCoverage
+	# Returns the coverage index of the roster, building it the first time it is needed
+	# It is then kept up to date by the functions that change the roster
+	#//////////////////////////////////////////////////////////
+	def __getCoverage(self):
+		if self.__coverage is None:
+			self.__coverage = coverage.Coverage(self.__days)
+		return self.__coverage
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__getIntervals
+	# Returns the shift time index of the roster, building it the first time it is needed
+	# Adding or removing staff discards it, to be rebuilt on the next query
+	#//////////////////////////////////////////////////////////
+	def __getIntervals(self):
+		if self.__intervals is None:
+			self.__intervals = intervals.Intervals(self.__days)
+		return self.__intervals
 
 	#//////////////////////////////////////////////////////////
-	# FUNCTION: self.__getExcelDate
-	# Converts an Excel Date serial number into a datetime Object
+	# FUNCTION: self.__getStaff
+	# Returns an array of staff names from a name, an array of names, or None for all staff
 	#
 	# Parameter(s):
-	#	xdate: Excel Date serial number
-	#	-- Datatype: String, Float or Int
+	#	xstaff: Staff member or array of staff members, or None
+	#	-- Datatype: String or Array
 	# Returns:
-	#	Python Datetime Object
+	#	Array of staff names
 	#//////////////////////////////////////////////////////////
-	def __getExcelDate(self,xdate):
-		xdate = int(float(xdate)) - 2	#Minus 2 days as Excel is inclusive
-		base = datetime.date(1900,1,1)
-		offset = datetime.timedelta(days=xdate)
-		return base + offset
+	def __getStaff(self,xstaff):
+		if xstaff is None:
+			return self.__days.staff()
+		elif isinstance(xstaff,str):
+			return [xstaff]
+		else:
+			return list(xstaff)
 
 	#//////////////////////////////////////////////////////////
-	# FUNCTION: self.__getDateRange
-	# Returns an array of datetime objects between two dates
+	# FUNCTION: self.__getPeriod
+	# Converts two dates into a (start,finish) pair in chronological order
 	#
 	# Parameter(s):
-	#	xdate,ydate: Start and Finish dates to compare
+	#	xdate,ydate: Start and Finish dates, in either order
 	#	-- Datatype: String
 	# Returns:
-	#	Array of datetime.datetime Objects between the two specified dates (inclusive)
+	#	Tuple of Python datetime.date Objects (earliest,latest)
 	#//////////////////////////////////////////////////////////
-	def __getDateRange(self,xdate,ydate):
-		arr = []
-		diff = self.__convertDate(xdate) - self.__convertDate(ydate)
-		for n in range(0,(abs(diff.days) + 1)):		#+1 to be inclusive of final date
-			arr.append(self.__convertDate(xdate) + datetime.timedelta(days=n))
-		return arr
+	def __getPeriod(self,xdate,ydate):
+		start = self.__convertDate(xdate)
+		finish = self.__convertDate(ydate)
+		if start > finish:
+			return finish,start
+		return start,finish
 
 #//////////////////////////////////////////////////////////////////
 # SECONDARY FUNCTIONS
@@ -252,8 +483,8 @@ class Roster:
 	def __showMember(self,xstaff):
 		output = {}
 		output[xstaff] = {}
-		for day in self.__days:
-			output[xstaff][day] = self.__days[day][xstaff]['shift']
+		for day,shift in self.__days.member(xstaff):
+			output[xstaff][dates.key(day)] = shift
 		return output
 
 	#//////////////////////////////////////////////////////////
@@ -267,16 +498,177 @@ class Roster:
 	#	-- Datatype: String
 	# Returns:
 	#	Dictionary of {'xstaff':{'DD/MM/YYY':'Shift'},{'DD/MM/YYY':'Shift'}}
+	#	-- Dates are in chronological order
 	#//////////////////////////////////////////////////////////
 	def __showMemberPeriod(self,xstaff,xstart,xfinish):
-		dates = self.__getDateRange(xstart,xfinish)
+		start,finish = self.__getPeriod(xstart,xfinish)
 		output = {}
 		output[xstaff] = {}
-		for day in dates:
-			try:
-				output[xstaff][day.strftime('%d/%m/%Y')] = self.__days[day.strftime('%d/%m/%Y')][xstaff]['shift']
-			except:
-				continue
+		try:
+			for day,shift in self.__days.memberPeriod(xstaff,start,finish):
+				output[xstaff][dates.key(day)] = shift
+		except KeyError:
+			pass
+		return output
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__query
+	# Returns the shifts of any number of staff members over a date range as one table
+	# Both the staff and the dates are resolved once, and the table is read in a
+	# single pass over the range rather than once per staff member
+	#
+	# Parameter(s):
+	#	xstart,xfinish: Start and finish dates
+	#	-- Datatype: String
+	#	xstaff: Optional. Staff member or array of staff members. Defaults to all staff
+	#	-- Datatype: String or Array
+	# Returns:
+	#	Dictionary of {'dates':['DD/MM/YYYY'],'staff':['StaffName'],'rows':[['Shift']]}
+	#	-- rows[n][m] is the shift of staff[m] on dates[n], or None if not rostered
+	#	-- Dates are in chronological order
+	#	Raises KeyError if a staff member is not in the roster
+	#//////////////////////////////////////////////////////////
+	def __query(self,xstart,xfinish,xstaff):
+		start,finish = self.__getPeriod(xstart,xfinish)
+		staff = self.__getStaff(xstaff)
+		period,rows = self.__days.table(staff,start,finish)
+		return {'dates':[dates.key(day) for day in period],'staff':staff,'rows':rows}
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__showTable
+	# Returns a table from self.__query() in the format of self.__showMemberPeriod()
+	#
+	# Returns:
+	#	Dictionary of {'xstaff':{'DD/MM/YYYY':'Shift'}} for every staff member of the table
+	#//////////////////////////////////////////////////////////
+	def __showTable(self,table):
+		staff = table['staff']
+		output = dict((name,{}) for name in staff)
+		columns = [output[name] for name in staff]
+		for day,row in zip(table['dates'],table['rows']):
+			for n in range(0,len(row)):
+				if row[n] is not None:
+					columns[n][day] = row[n]
+		return output
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__showHours
+	# Totals the worked, break and payable hours per staff member over a date range
+	# Shifts are counted per shift name in one pass, then multiplied by the
+	# hours of each shift name rather than building a Shift per cell
+	#
+	# Parameter(s):
+	#	xstart,xfinish: Start and finish dates
+	#	-- Datatype: String
+	#	xstaff: Optional. Staff member or array of staff members to total
+	#		Defaults to all staff
+	#	-- Datatype: String or Array
+	# Returns:
+	#	Dictionary of {'xstaff':{'worked':timedelta,'breaks':timedelta,'hours':timedelta}}
+	#//////////////////////////////////////////////////////////
+	def __showHours(self,xstart,xfinish,xstaff):
+		start,finish = self.__getPeriod(xstart,xfinish)
+		counts = self.__days.counts(start,finish)
+		output = {}
+		for name in self.__getStaff(xstaff):
+			worked = breaks = hours = datetime.timedelta(0)
+			for shift,count in counts.get(name,{}).items():
+				shiftWorked,shiftBreaks,shiftHours = shifts.shiftHours(shift)
+				worked += shiftWorked * count
+				breaks += shiftBreaks * count
+				hours += shiftHours * count
+			output[name] = {'worked':worked,'breaks':breaks,'hours':hours}
+		return output
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__exportShifts
+	# Returns a generator of every worked shift, for the calendar exporters
+	#
+	# Parameter(s):
+	#	xstart,xfinish: Start and finish dates, or None for the whole roster
+	#	-- Datatype: String
+	#	xstaff: Staff member or array of staff members, or None for all staff
+	#	-- Datatype: String or Array
+	# Returns:
+	#	Generator of ('StaffName','Shift',start datetime,finish datetime) tuples
+	#	Raises KeyError if a staff member is not in the roster
+	#//////////////////////////////////////////////////////////
+	def __exportShifts(self,xstart,xfinish,xstaff):
+		start = finish = None
+		if xstart is not None or xfinish is not None:
+			start,finish = self.__getPeriod(xstart if xstart is not None else xfinish,xfinish if xfinish is not None else xstart)
+		staff = self.__getStaff(xstaff)
+		known = set(self.__days.staff())
+		for name in staff:
+			if name not in known:
+				raise KeyError(name)
+		return export.worked(self.__days,staff,start,finish)
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__headcount
+	# Returns the number of staff working a shift, or each shift, on a date
+	#
+	# Parameter(s):
+	#	xdate: Date to count
+	#	-- Datatype: Python datetime.date Object
+	#	xshift: Shift name to count, or None for every shift
+	#	-- Datatype: String
+	# Returns:
+	#	Integer headcount, or Dictionary of {'Shift':headcount} if xshift is None
+	#	Raises KeyError if the date is not in the roster
+	#//////////////////////////////////////////////////////////
+	def __headcount(self,xdate,xshift):
+		if xshift is None:
+			return self.__getCoverage().shifts(xdate)
+		return self.__getCoverage().headcount(xdate,xshift)
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__showCoverage
+	# Returns the headcount of each shift for each date within a date range
+	#
+	# Parameter(s):
+	#	xstart,xfinish: Start and finish dates
+	#	-- Datatype: String
+	#	xshift: Optional. Shift name to count. Defaults to every shift
+	#	-- Datatype: String
+	# Returns:
+	#	Dictionary of {'DD/MM/YYYY':{'Shift':headcount}}
+	#	-- Dates are in chronological order
+	#//////////////////////////////////////////////////////////
+	def __showCoverage(self,xstart,xfinish,xshift):
+		start,finish = self.__getPeriod(xstart,xfinish)
+		output = {}
+		for day,counts in self.__getCoverage().period(start,finish):
+			if xshift is None:
+				output[dates.key(day)] = counts
+			else:
+				output[dates.key(day)] = {xshift:counts.get(xshift,0)}
+		return output
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__understaffed
+	# Returns each date and shift within a date range with fewer staff than required
+	#
+	# Parameter(s):
+	#	xstart,xfinish: Start and finish dates
+	#	-- Datatype: String
+	#	minimums: Minimum headcount of each shift, e.g. {'Night':2,'Day':3}
+	#	-- Datatype: Dictionary of {'Shift':headcount}
+	# Returns:
+	#	Dictionary of {'DD/MM/YYYY':{'Shift':staff short}}
+	#	-- Only dates with at least one understaffed shift are included
+	#//////////////////////////////////////////////////////////
+	def __understaffed(self,xstart,xfinish,minimums):
+		start,finish = self.__getPeriod(xstart,xfinish)
+		output = {}
+		for day,counts in self.__getCoverage().period(start,finish):
+			short = {}
+			for shift,required in minimums.items():
+				count = counts.get(shift,0)
+				if count < required:
+					short[shift] = required - count
+			if short:
+				output[dates.key(day)] = short
 		return output
 
 	#//////////////////////////////////////////////////////////
@@ -288,8 +680,10 @@ class Roster:
 	#	-- Datatype: String
 	#//////////////////////////////////////////////////////////
 	def __removeMember(self,xstaff):
-		for day in self.__days:
-			self.__days[day].removeMember(xstaff)
+		self.__days.removeMember(xstaff)
+		if self.__coverage is not None:
+			self.__coverage.removeMember(xstaff)
+		self.__intervals = None
 
 	#//////////////////////////////////////////////////////////
 	# FUNCTION: self.__addMember
@@ -301,47 +695,74 @@ class Roster:
 	#	xdate: Optional. Default name of shift to be created for each day added
 	#		Defaults to global var DEFAULTNEWSHIFT if not included
 	#	-- Datatype: String
+	#	Raises KeyError if the staff member already exists
 	#//////////////////////////////////////////////////////////
 	def __addMember(self,xstaff,xdefault):
-		for day in self.__days:
-			self.__days[day].addMember(xstaff,xdefault)
+		self.__days.addMember(xstaff,xdefault)
+		if self.__coverage is not None:
+			self.__coverage.addMember(xstaff,xdefault)
+		self.__intervals = None
 
 	#//////////////////////////////////////////////////////////
 	# FUNCTION: self.__updateShift
-	# Creates a new Shift Object for a staff member on the specified date
+	# Changes the shift of a staff member on the specified date
 	#
 	# Parameter(s):
 	#	xstaff: Keyname of the staff member to update
 	#	-- Datatype: String
-	#	xshift: Name of the Shift Object to be created
+	#	xshift: Name of the new shift
 	#	-- Datatype: String
 	#	xdate: Date of the day to update
 	#	-- Datatype: String
+	# Returns:
+	#	Array of changes, as per self.__updateShifts()
+	#	Raises KeyError if the date is not in the roster
 	#//////////////////////////////////////////////////////////
 	def __updateShift(self,xstaff,xshift,xdate):
-		print("To Come...")
+		day = self.__convertDate(xdate)
+		if day is None or not self.__days.hasDate(day):
+			raise KeyError(xdate)
+		return self.__updateShifts([(xstaff,day,day,xshift)])
 
-#//////////////////////////////////////////////////////////////////
-# SUBCLASSES
-# Internally used classes for various repetetive functions
-#//////////////////////////////////////////////////////////////////
-	# CLASS: REMatcher
-	# Allows you to compare a string against regex and retain the matched groups
-	# Similar to Perl's 'if(str ~= /regex/)' function
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__updateShifts
+	# Applies a batch of shift changes, each to a staff member over a date range
+	# Every edit is checked before any is applied, so a bad edit changes nothing
+	# Only the changed cells are rewritten, and the coverage and shift time
+	# indexes are updated cell by cell rather than rebuilt
+	# Dates within a range that are not in the roster are skipped
 	#
 	# Parameter(s):
-	#	matchstring: The string which to compare regex against
-	#	Datatype: String
+	#	edits: ('StaffName',start date,finish date,'Shift') tuples, applied in order
+	#	-- Datatype: Array
+	# Returns:
+	#	Array of ('StaffName','DD/MM/YYYY','OldShift','NewShift') tuples for each changed cell
+	#	-- OldShift is None if the staff member was not rostered on that date
+	#	Raises KeyError if a staff member is not in the roster
 	#//////////////////////////////////////////////////////////
-	class REMatcher(object):
-		def __init__(self,matchstring):
-			self.matchstring = matchstring
-
-		# Match the str against the desired regex
-		def match(self,expr):
-			self.rematch = re.match(expr, self.matchstring)
-			return bool(self.rematch)
+	def __updateShifts(self,edits):
+		staff = set(self.__days.staff())
+		resolved = []
+		for xstaff,xstart,xfinish,xshift in edits:
+			if xstaff not in staff:
+				raise KeyError(xstaff)
+			start,finish = self.__getPeriod(xstart,xfinish)
+			resolved.append((xstaff,start,finish,xshift))
+		changes = []
+		for xstaff,start,finish,xshift in resolved:
+			for day,old in self.__days.update(xstaff,start,finish,xshift):
+				self.__reindex(day,xstaff,old,xshift)
+				changes.append((xstaff,dates.key(day),old,xshift))
+		return changes
 
-		# Returns group(i) of the strings that were 'match()'ed
-		def group(self,i):
-			return self.rematch.group(i)
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__reindex
+	# Moves one cell from its old shift to its new shift in any built indexes
+	#//////////////////////////////////////////////////////////
+	def __reindex(self,xdate,xstaff,xold,xshift):
+		if self.__coverage is not None:
+			self.__coverage.remove(xdate,xstaff,xold)
+			self.__coverage.add(xdate,xstaff,xshift)
+		if self.__intervals is not None:
+			self.__intervals.remove(xdate,xstaff,xold)
+			self.__intervals.add(xdate,xstaff,xshift)
@@ -0,0 +1,361 @@
+#!/usr/bin/env python
+
+from array import array
+from bisect import bisect_left, bisect_right
+import csv
+import datetime
+import mmap
+import os
+import struct
+import sys
+
+import dates
+
+#########
+# GLOBALS
+#########
+MAGIC = b'XPRI'		#Identifies a roster row index file
+VERSION = 1
+HEADER = struct.Struct('<4sHBxqqI4x')	#magic, version, byteorder, CSV size, CSV mtime (ns), rows
+ORDINALTYPE = 'i'	#Date ordinal of each row
+OFFSETTYPE = 'q'	#Byte offset of each row within the CSV
+INDEXSUFFIX = '.idx'	#Appended to the CSV file name, e.g. roster20180202.csv.idx
+CSVDIALECT = 'excel'
+CSVENCODING = 'utf-8'
+BYTEORDER = {'little':0,'big':1}
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: indexPath
+# Returns the file location of the row index of a CSV
+#//////////////////////////////////////////////////////////////////
+def indexPath(csvfile):
+	return csvfile + INDEXSUFFIX
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: write
+# Scans a converted CSV once and saves the byte offset of each date's row
+# beside it. Where a date appears twice, the later row is indexed, as it is
+# the one a full load keeps
+#
+# File layout:
+#	Header: MAGIC, version, byte order, size and mtime of the CSV, row count
+#	Ordinals: one signed int per row, sorted
+#	Offsets: one signed long long per row, in the order of the ordinals
+#
+# Parameter(s):
+#	csvfile: File location of the CSV to index
+#	-- Datatype: String
+#	path: Optional. File location of the index, defaults to indexPath(csvfile)
+#	-- Datatype: String
+# Returns:
+#	RowIndex Object
+#//////////////////////////////////////////////////////////////////
+def write(csvfile,path=None):
+	index = _build(csvfile)
+	ordinals,offsets = index.entries()
+	stat = os.stat(csvfile)
+	path = path or indexPath(csvfile)
+	temp = path + ".tmp"
+	with open(temp,'wb') as out_file:
+		out_file.write(HEADER.pack(MAGIC,VERSION,BYTEORDER[sys.byteorder],stat.st_size,stat.st_mtime_ns,len(ordinals)))
+		ordinals.tofile(out_file)
+		offsets.tofile(out_file)
+	os.replace(temp,path)
+	return index
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: load
+# Opens the row index of a CSV, memory-mapping the CSV itself
+# The index is rebuilt and saved when it is missing, or when the CSV has
+# changed since it was written. If it cannot be saved it is only held in memory
+#
+# Parameter(s):
+#	csvfile: File location of the CSV
+#	-- Datatype: String
+#	path: Optional. File location of the index, defaults to indexPath(csvfile)
+#	-- Datatype: String
+# Returns:
+#	RowIndex Object
+#//////////////////////////////////////////////////////////////////
+def load(csvfile,path=None):
+	path = path or indexPath(csvfile)
+	stat = os.stat(csvfile)
+	try:
+		with open(path,'rb') as in_file:
+			magic,version,byteorder,size,mtime,count = HEADER.unpack(in_file.read(HEADER.size))
+			if magic != MAGIC or version != VERSION or size != stat.st_size or mtime != stat.st_mtime_ns:
+				raise ValueError(path + " does not index the current " + csvfile)
+			ordinals = array(ORDINALTYPE)
+			offsets = array(OFFSETTYPE)
+			ordinals.fromfile(in_file,count)
+			offsets.fromfile(in_file,count)
+	except (IOError,OSError,ValueError,EOFError,struct.error):
+		try:
+			return write(csvfile,path)
+		except (IOError,OSError):		#e.g. a read-only folder
+			return _build(csvfile)
+	if byteorder != BYTEORDER[sys.byteorder]:		#Written on another platform
+		ordinals.byteswap()
+		offsets.byteswap()
+	return RowIndex(_map(csvfile),ordinals,offsets)
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: _build
+# Scans a CSV for the offset of each row, without keeping the rows
+#//////////////////////////////////////////////////////////////////
+def _build(csvfile):
+	mapped = _map(csvfile)
+	starts = []
+	column = []
+	records = _records(mapped,0)
+	next(records,None)		#Skip the headers
+	for start,row in records:
+		starts.append(start)
+		column.append(row[0] if row else '')
+	latest = {}
+	for start,date in zip(starts,dates.convertColumn(column)):
+		if date is not None:
+			latest[date.toordinal()] = start		#Later rows replace earlier rows of the same date
+	ordinals = sorted(latest)
+	return RowIndex(mapped,array(ORDINALTYPE,ordinals),array(OFFSETTYPE,[latest[ordinal] for ordinal in ordinals]))
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: _map
+# Memory-maps a CSV for reading
+#//////////////////////////////////////////////////////////////////
+def _map(csvfile):
+	with open(csvfile,'rb') as in_file:
+		return mmap.mmap(in_file.fileno(),0,access=mmap.ACCESS_READ)
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: _records
+# Yields the byte offset and fields of each CSV record from an offset onwards
+# A record continues onto the next line while it has an open quoted field
+#
+# Parameter(s):
+#	mapped: The memory-mapped CSV
+#	-- Datatype: mmap.mmap Object
+#	offset: Byte offset of the first record to read
+#	-- Datatype: Integer
+# Yields:
+#	Tuples of (offset, Array of each field)
+#//////////////////////////////////////////////////////////////////
+def _records(mapped,offset):
+	end = len(mapped)
+	while offset < end:
+		start = offset
+		lines = []
+		quotes = 0
+		while offset < end:
+			stop = mapped.find(b'\n',offset)
+			stop = end if stop < 0 else stop + 1
+			line = mapped[offset:stop]
+			quotes += line.count(b'"')
+			lines.append(line.decode(CSVENCODING))
+			offset = stop
+			if not quotes % 2:
+				break
+		yield start,next(csv.reader(lines,dialect=CSVDIALECT),[])
+
+#//////////////////////////////////////////////////////////////////
+# CLASS: RowIndex
+# The dates of a converted CSV and where each of their rows starts
+# Rows are only parsed when asked for, straight from the memory-mapped CSV,
+# so reading a fortnight of a long roster touches a fortnight of the file
+# The CSV must not be rewritten while it is open
+#
+# Parameter(s):
+#	mapped: The memory-mapped CSV
+#	-- Datatype: mmap.mmap Object
+#	ordinals: Sorted date ordinal of each row
+#	-- Datatype: array.array
+#	offsets: Byte offset of the row of each ordinal
+#	-- Datatype: array.array
+#//////////////////////////////////////////////////////////////////
+class RowIndex:
+	def __init__(self,mapped,ordinals,offsets):
+		self.__mapped = mapped
+		self.__ordinals = ordinals
+		self.__offsets = offsets
+		self.__headers = next(_records(mapped,0),(0,[]))[1]
+
+	def __len__(self):
+		return len(self.__ordinals)
+
+#//////////////////////////////////////////////////////////////////
+# PUBLIC FUNCTIONS
+# Callable by the Roster class and the Lazy storage engine
+#//////////////////////////////////////////////////////////////////
+	def headers(self):
+		return list(self.__headers)
+
+	def entries(self):
+		return self.__ordinals,self.__offsets
+
+	def dates(self):
+		return [datetime.date.fromordinal(ordinal) for ordinal in self.__ordinals]
+
+	def period(self,xstart,xfinish):
+		lo,hi = self.__bounds(xstart,xfinish)
+		return [datetime.date.fromordinal(ordinal) for ordinal in self.__ordinals[lo:hi]]
+
+	def bounds(self,xstart=None,xfinish=None):
+		return self.__bounds(xstart,xfinish)
+
+	def rows(self,lo,hi):
+		return self.__rows(lo,hi)
+
+	def close(self):
+		self.__mapped.close()
+
+#//////////////////////////////////////////////////////////////////
+# PRIVATE FUNCTIONS
+# Used by Public functions to access and manipulate private variables
+#//////////////////////////////////////////////////////////////////
+	# FUNCTION: self.__bounds
+	# Returns the positions of the first and after the last row within a date range
+	#
+	# Parameter(s):
+	#	xstart,xfinish: First and last dates, or None for either end of the roster
+	#	-- Datatype: Python datetime.date Object
+	# Returns:
+	#	Tuple of Integers (lo, hi)
+	#//////////////////////////////////////////////////////////
+	def __bounds(self,xstart,xfinish):
+		lo = 0 if xstart is None else bisect_left(self.__ordinals,xstart.toordinal())
+		hi = len(self.__ordinals) if xfinish is None else bisect_right(self.__ordinals,xfinish.toordinal(),lo)
+		return lo,hi
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__rows
+	# Yields the date and fields of each row between two positions
+	# Rows are parsed from their offsets, so nothing outside them is read
+	#
+	# Parameter(s):
+	#	lo,hi: Positions as returned by self.__bounds()
+	#	-- Datatype: Integer
+	# Yields:
+	#	Tuples of (Python datetime.date Object, Array of each field)
+	#//////////////////////////////////////////////////////////
+	def __rows(self,lo,hi):
+		for n in range(lo,hi):
+			start,row = next(_records(self.__mapped,self.__offsets[n]))
+			yield datetime.date.fromordinal(self.__ordinals[n]),row
+
+#//////////////////////////////////////////////////////////////////
+# CLASS: Lazy
+# A storage engine that fills another engine from a RowIndex as dates are used
+# Dates are known up front from the index, but each row is only parsed the
+# first time a query reaches it. Anything needing every row (e.g. a whole
+# member, adding staff) loads the rest, after which the CSV is closed
+#
+# Parameter(s):
+#	index: Row index of the CSV
+#	-- Datatype: RowIndex Object
+#	engine: Storage engine to fill, e.g. day.Days or matrix.Matrix
+#	-- Datatype: Class
+#//////////////////////////////////////////////////////////////////
+class Lazy:
+	def __init__(self,index,engine):
+		self.__index = index
+		self.__store = engine(index.headers()[1:])		#Skip the date header
+		self.__loaded = bytearray(len(index))		#1 for each position of the index already parsed
+		self.__remaining = len(index)
+
+	def __len__(self):
+		return len(self.dates())
+
+#//////////////////////////////////////////////////////////////////
+# PUBLIC FUNCTIONS
+# The storage engine interface, as per day.Days and matrix.Matrix
+#//////////////////////////////////////////////////////////////////
+	def staff(self):
+		return self.__store.staff()
+
+	def dates(self):
+		if self.__index is None:
+			return self.__store.dates()
+		return self.__index.dates()
+
+	def period(self,xstart,xfinish):
+		if self.__index is None:
+			return self.__store.period(xstart,xfinish)
+		return self.__index.period(xstart,xfinish)
+
+	def hasDate(self,xdate):
+		if self.__index is None:
+			return self.__store.hasDate(xdate)
+		lo,hi = self.__index.bounds(xdate,xdate)
+		return hi > lo
+
+	def append(self,xdate,row):
+		self.__fill(None,None)
+		self.__store.append(xdate,row)
+
+	def working(self,xdate):
+		self.__fill(xdate,xdate)
+		return self.__store.working(xdate)
+
+	def shift(self,xdate,xstaff):
+		self.__fill(xdate,xdate)
+		return self.__store.shift(xdate,xstaff)
+
+	def member(self,xstaff):
+		self.__fill(None,None)
+		return self.__store.member(xstaff)
+
+	def memberPeriod(self,xstaff,xstart,xfinish):
+		self.__fill(xstart,xfinish)
+		return self.__store.memberPeriod(xstaff,xstart,xfinish)
+
+	def table(self,staff,xstart,xfinish):
+		self.__fill(xstart,xfinish)
+		return self.__store.table(staff,xstart,xfinish)
+
+	def counts(self,xstart,xfinish):
+		self.__fill(xstart,xfinish)
+		return self.__store.counts(xstart,xfinish)
+
+	def update(self,xstaff,xstart,xfinish,xshift):
+		self.__fill(xstart,xfinish)
+		return self.__store.update(xstaff,xstart,xfinish,xshift)
+
+	def addMember(self,xstaff,xdefault):
+		self.__fill(None,None)
+		self.__store.addMember(xstaff,xdefault)
+
+	def removeMember(self,xstaff):
+		self.__fill(None,None)
+		self.__store.removeMember(xstaff)
+
+#//////////////////////////////////////////////////////////////////
+# PRIVATE FUNCTIONS
+# Used by Public functions to access and manipulate private variables
+#//////////////////////////////////////////////////////////////////
+	# FUNCTION: self.__fill
+	# Parses any rows within a date range not yet held by the store
+	# Closes the index once every row has been parsed
+	#
+	# Parameter(s):
+	#	xstart,xfinish: First and last dates, or None for either end of the roster
+	#	-- Datatype: Python datetime.date Object
+	#//////////////////////////////////////////////////////////
+	def __fill(self,xstart,xfinish):
+		if self.__index is None:
+			return
+		lo,hi = self.__index.bounds(xstart,xfinish)
+		n = lo
+		while n < hi:
+			if self.__loaded[n]:
+				n += 1
+				continue
+			first = n
+			while n < hi and not self.__loaded[n]:		#Parse each unloaded run in one pass
+				self.__loaded[n] = 1
+				n += 1
+			for date,row in self.__index.rows(first,n):
+				self.__store.append(date,row[1:])
+			self.__remaining -= n - first
+		if not self.__remaining:
+			self.__index.close()
+			self.__index = None
@@ -1,32 +1,184 @@
 #!/usr/bin/env python
 
+from collections import OrderedDict
 from datetime import datetime, date, time, timedelta
+import json
 import os.path
 
+#########
+# GLOBALS
+#########
+SHIFTTIMES = {"D":[time(8,30),time(17)],
+	"Day8":[time(8,30),time(17)],
+	"Day":[time(7),time(19)],
+	"Night":[time(19),time(7)],
+	"Morning":[time(6),time(15,30)],
+	"Evening":[time(14),time(23,20)],
+	"Grave":[time(22),time(7,30)],
+	"Off":[time(0),time(0)],
+	"SS Off":[time(0),time(0)],
+	"Ann Lve":[time(0),time(0)],
+	"sick":[time(0),time(0)]}
+# SHIFTTIMES - Start and finish time of each shift name. Any other name is treated as off work
+# A finish time before the start time finishes on the following day
+SHIFTCONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)),"shifts.json")
+# SHIFTCONFIG - Optional JSON file replacing SHIFTTIMES, e.g. {"Night":["19:00","07:00"],"Off":["00:00","00:00"]}
+BREAKLENGTH = timedelta(minutes=30)	#Unpaid break time
+BREAKINTERVAL = timedelta(hours=6)	#One break for every interval worked
+OFFWORK = (timedelta(0),timedelta(0),timedelta(0),timedelta(0))	#Catalogue entry of any unknown shift name
+CATALOGUE = {}		#shift name : (start after midnight, worked, breaks, payable) - see loadCatalogue()
+SHIFTCACHE = OrderedDict()	#(date, shift name) : Shift Object, least recently used first - see getShift()
+SHIFTCACHESIZE = 16384	#Most Shift objects kept by getShift(), e.g. 4 years of 10 shift names
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: compileCatalogue
+# Measures each shift name once, so that every Shift is a lookup of its name
+#
+# Parameter(s):
+#	definitions: Start and finish time of each shift name, as per SHIFTTIMES
+#	-- Datatype: Dictionary of {'shiftName':[time(start),time(finish)]}
+# Returns:
+#	Dictionary of {'shiftName':(start after midnight, worked, breaks, payable)}
+#	-- Each is a timedelta object
+#//////////////////////////////////////////////////////////////////
+def compileCatalogue(definitions):
+	catalogue = {}
+	midnight = datetime.combine(date.min,time(0))
+	for name,(start,finish) in definitions.items():
+		offset = datetime.combine(date.min,start) - midnight
+		if start > finish:
+			worked = timedelta(days=1) - offset + (datetime.combine(date.min,finish) - midnight)	#Finishes the following day
+		else:
+			worked = datetime.combine(date.min,finish) - datetime.combine(date.min,start)
+		breaks = BREAKLENGTH * (worked.seconds // int(BREAKINTERVAL.total_seconds()))
+		catalogue[name] = (offset,worked,breaks,worked - breaks)
+	return catalogue
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: loadCatalogue
+# Replaces the shift catalogue used by every Shift, and empties the Shift cache
+#
+# Parameter(s):
+#	definitions: Optional. Start and finish time of each shift name, as per SHIFTTIMES
+#		Defaults to the contents of the config file if it exists, otherwise SHIFTTIMES
+#	-- Datatype: Dictionary of {'shiftName':[time(start),time(finish)]}
+#	path: Optional. JSON config file of {'shiftName':['HH:MM','HH:MM']}
+#	-- Datatype: String
+#//////////////////////////////////////////////////////////////////
+def loadCatalogue(definitions=None,path=SHIFTCONFIG):
+	if definitions is None:
+		definitions = _readConfig(path) if path and os.path.isfile(path) else SHIFTTIMES
+	compiled = compileCatalogue(definitions)
+	CATALOGUE.clear()
+	CATALOGUE.update(compiled)
+	SHIFTCACHE.clear()
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: getShift
+# Returns the shared Shift object for a shift name on a given date
+# Shift objects are read-only, so every Person working the same shift on the
+# same day can share one object rather than building their own
+# Only the SHIFTCACHESIZE most recently used are kept, so long-running
+# processes do not keep every date they have ever loaded
+#
+# Parameter(s):
+#	shiftdate: The day on which the shift begins
+#	-- Datatype: Python datetime.date Object
+#	period: The shift name
+#	-- Datatype: String
+# Returns:
+#	Shift Object
+#//////////////////////////////////////////////////////////////////
+def getShift(shiftdate,period):
+	key = (shiftdate,period)
+	shift = SHIFTCACHE.get(key)
+	if shift is None:
+		shift = SHIFTCACHE[key] = Shift(shiftdate,period)
+		if len(SHIFTCACHE) > SHIFTCACHESIZE:
+			SHIFTCACHE.popitem(last=False)
+	else:
+		SHIFTCACHE.move_to_end(key)
+	return shift
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: shiftHours
+# Returns the hours of a shift name, which are the same on every date
+# Overnight shifts are measured through to their finish on the following day
+#
+# Parameter(s):
+#	period: The shift name
+#	-- Datatype: String
+# Returns:
+#	Tuple of timedelta objects (worked, breaks, payable)
+#//////////////////////////////////////////////////////////////////
+def shiftHours(period):
+	return CATALOGUE.get(period,OFFWORK)[1:]
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: shiftSpan
+# Returns when a shift name starts and how long it lasts, which are the same on every date
+#
+# Parameter(s):
+#	period: The shift name
+#	-- Datatype: String
+# Returns:
+#	Tuple of timedelta objects (start after midnight, length)
+#//////////////////////////////////////////////////////////////////
+def shiftSpan(period):
+	return CATALOGUE.get(period,OFFWORK)[:2]
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: clearShifts
+# Empties the shared Shift objects cached by getShift()
+#//////////////////////////////////////////////////////////////////
+def clearShifts():
+	SHIFTCACHE.clear()
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: _readConfig
+# Reads shift definitions from a JSON config file
+#
+# Parameter(s):
+#	path: File location of the config, as per SHIFTCONFIG
+#	-- Datatype: String
+# Returns:
+#	Dictionary of {'shiftName':[time(start),time(finish)]}
+#//////////////////////////////////////////////////////////////////
+def _readConfig(path):
+	with open(path,'r') as config:
+		definitions = json.load(config)
+	return dict((name,[_readTime(start),_readTime(finish)]) for name,(start,finish) in definitions.items())
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: _readTime
+# Converts an 'HH:MM' string to a time object
+#//////////////////////////////////////////////////////////////////
+def _readTime(text):
+	hour,minute = text.split(":")
+	return time(int(hour),int(minute))
+
 #//////////////////////////////////////////////////////////////////
 # CLASS: Shift
 # A class for populating a 'Shift' object as part of a roster
 #
 # Parameter(s):
 #	shiftdate: The day on which a shift begins.
-#	Datatype: Integer
-#		- This should be in the Excel date serial format - e.g. 430101
+#	Datatype: Python datetime.date Object
 #	period: The 'shift' that the staff member is meant to work
 #	Datatype: String
 #		- Accepts any set of strings to convert into start/finish times
-#		- Strings and shift times can be set in _getShiftTimes
+#		- Strings and shift times can be set in SHIFTTIMES or SHIFTCONFIG
 #		- Outputs start/finish times as datetime objects
+#		- Times are only looked up on first access to start/finish/hours
 #//////////////////////////////////////////////////////////////////
 class Shift:
 	def __init__(self,shiftdate,period):
 		self.__date = shiftdate #Start date of the shift
 		self.__period = period #The shift "name"
-		self.__start,self.__finish = self.__getShiftTimes(self.__date,self.__period) #Start time
-		self.__hoursWorked = self.__getHours(self.__start,self.__finish) #Total hours worked
-		self.__breaks = self.__calcBreaks(self.__hoursWorked) #Unpaid break time
-		self.__hoursPayable = self.__getTotalHours(self.__hoursWorked,self.__breaks) #Total billable hours
+		self.__start = None #Set with the remaining times by self.__calculate()
 
 	def __str__(self):
+		self.__calculate()
 		string = "Date: %s \n" % self.__date
 		string += "Start Time: %s \n" % self.__start
 		string += "Finish Time: %s \n" % self.__finish
@@ -46,116 +198,42 @@ class Shift:
 		return self.__period
 
 	def start(self):
+		self.__calculate()
 		return self.__start
 
 	def finish(self):
+		self.__calculate()
 		return self.__finish
 
 	def worked(self):
+		self.__calculate()
 		return self.__hoursWorked
 
 	def breaks(self):
+		self.__calculate()
 		return self.__breaks
 
 	def hours(self):
+		self.__calculate()
 		return self.__hoursPayable
 
 #//////////////////////////////////////////////////////////////////
 # PRIVATE FUNCTIONS
 # Used by Public functions to access and manipulate private variables
 #//////////////////////////////////////////////////////////////////
-	# FUNCTION: self.__getDate
-	# Convert the Excel date serial number to Python datetime
-	#
-	# Parameter(s):
-	#	xdate = Excel date serial number
-	#		e.g. 430101 = 1/1/2018
-	#	Note: Two days are deducted from this number
-	#		This is because Python is exclusive of the start/finish dates in calculation
-	#		Whereas Excel is inclusive of these dates
-	#//////////////////////////////////////////////////////////
-	def __getDate(self,xdate):
-		xdate = xdate - 2
-		base = date(1900,1,1)
-		offset = timedelta(days=xdate)
-		return base + offset
-
-	#//////////////////////////////////////////////////////////
-	# FUNCTION: self.__getShiftTimes
-	# Converts a shift description to a start end time
-	#
-	# Parameter(s):
-	#	xdate = datetime date object
-	#	xshift = String type
-	#		This is compared against the dictionary
-	#		to return the start and finish times
-	# Returns:
-	#	Two datetime objects
-	#//////////////////////////////////////////////////////////
-	def __getShiftTimes(self,xdate,xshift):
-		opts = {"D":[time(8,30),time(17)],
-			"Day8":[time(8,30),time(17)],
-			"Day":[time(7),time(19)],
-			"Night":[time(19),time(7)],
-			"Morning":[time(6),time(15,30)],
-			"Evening":[time(14),time(23,20)],
-			"Grave":[time(22),time(7,30)],
-			"Off":[time(0),time(0)],
-			"SS Off":[time(0),time(0)],
-			"Ann Lve":[time(0),time(0)],
-			"sick":[time(0),time(0)]}
-		shift = opts.get(xshift,[time(0),time(0)]) #Defaults to 'Off Work'
-
-		if shift[0] > shift[1]:
-			#Sets finish time to following day
-			shift[0] = datetime.combine(xdate,shift[0])
-			shift[1] = datetime.combine((xdate + timedelta(days=1)),shift[1])
-		else:
-			shift[0] = datetime.combine(xdate,shift[0])
-			shift[1] = datetime.combine(xdate,shift[1])
-
-		return shift[0],shift[1]
-
-	#//////////////////////////////////////////////////////////
-	# FUNCTION: self.__getHours
-	# Determines the total hours worked based on start and finish times
-	#
-	# Parameter(s):
-	#	start = Starting time datetime object
-	#	finish = Finishing time datetime object
-	# Returns:
-	#	timedelta object containing the time difference
-	#//////////////////////////////////////////////////////////
-	def __getHours(self,start,finish):
-		worked = finish - start #returns timedelta object (only returns days/seconds/milliseconds)
-		return worked
-
-	#//////////////////////////////////////////////////////////
-	# FUNCTION: self.__calcBreaks
-	# Calculates the total break time based on total hours worked
-	# Length of break and interval time between breaks can be altered as required
-	#
-	# Parameter(s):
-	#	wtime = timedelta object of total time worked
-	# Returns:
-	#	timedelta object of total allocated break time
-	#//////////////////////////////////////////////////////////
-	def __calcBreaks(self,wtime):
-		lunchTime = 30 * 60 #30-minute break
-		breakInterval = (6 * 60) * 60 #Every 6 hours
-
-		breaks = wtime.seconds // breakInterval #Number of breaks
-		return timedelta(seconds=(breaks * lunchTime)) #Total unpaid time @ lunch
-
-	#//////////////////////////////////////////////////////////
-	# FUNCTION: self.__getTotalHours
-	# Calculates the total amount of billable hours
-	#
-	# Parameter(s):
-	#	wtime = datetime object of total hours worked
-	#	breaks = datetime object of total breaks allocated
-	# Returns:
-	#	timedelta object of total billable hours
+	# FUNCTION: self.__calculate
+	# Populates the start/finish times and hours of the shift from the catalogue
+	# Only runs once, the first time any of them are requested
 	#//////////////////////////////////////////////////////////
-	def __getTotalHours(self,wtime,breaks):
-		return wtime - breaks
+	def __calculate(self):
+		if self.__start is not None:
+			return
+		offset,worked,breaks,payable = CATALOGUE.get(self.__period,OFFWORK)
+		self.__start = datetime.combine(self.__date,time(0)) + offset #Start time
+		self.__finish = self.__start + worked #Finish time, the following day for overnight shifts
+		self.__hoursWorked = worked #Total hours worked
+		self.__breaks = breaks #Unpaid break time
+		self.__hoursPayable = payable #Total billable hours
+
+#Compiled once, when the module is first imported
+loadCatalogue()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+
+from array import array
+import mmap
+import struct
+import sys
+
+import matrix
+
+#########
+# GLOBALS
+#########
+MAGIC = b'XPRS'		#Identifies a roster snapshot file
+VERSION = 1
+HEADER = struct.Struct('<4sHBBIII')	#magic, version, byteorder, cell size, staff, days, codes
+LENGTH = struct.Struct('<H')		#Length prefix of each string in the staff/code tables
+ORDINALTYPE = 'i'	#Date ordinal of each row
+CELLTYPE = matrix.CELLTYPE
+BYTEORDER = {'little':0,'big':1}
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: write
+# Saves a Matrix as a compact binary snapshot
+#
+# File layout:
+#	Header: MAGIC, version, byte order, cell size, staff count, day count, code count
+#	Staff table: length-prefixed UTF-8 staff names
+#	Code table: length-prefixed UTF-8 shift names, code 0 first
+#	Ordinals: one signed int per day, padded to start on an 8-byte boundary
+#	Cells: one unsigned short per cell, row-major by day
+#
+# Parameter(s):
+#	xmatrix: The matrix to save
+#	-- Datatype: matrix.Matrix Object
+#	path: File location of the snapshot
+#	-- Datatype: String
+#//////////////////////////////////////////////////////////////////
+def write(xmatrix,path):
+	staff = xmatrix.staff()
+	codes = xmatrix.codes()
+	ordinals = array(ORDINALTYPE,xmatrix.ordinals())
+	cells = array(CELLTYPE,xmatrix.cells())
+
+	with open(path,'wb') as out_file:
+		out_file.write(HEADER.pack(MAGIC,VERSION,BYTEORDER[sys.byteorder],cells.itemsize,len(staff),len(ordinals),len(codes)))
+		for name in staff + codes:
+			encoded = str(name).encode('utf-8')
+			out_file.write(LENGTH.pack(len(encoded)))
+			out_file.write(encoded)
+		out_file.write(b'\0' * (-out_file.tell() % 8))
+		ordinals.tofile(out_file)
+		cells.tofile(out_file)
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: load
+# Opens a binary snapshot as a Matrix without parsing its cells
+# The ordinals and cells are memory-mapped, so only the pages that are
+# actually queried are read from disk
+#
+# Parameter(s):
+#	path: File location of the snapshot
+#	-- Datatype: String
+# Returns:
+#	matrix.Matrix Object
+#//////////////////////////////////////////////////////////////////
+def load(path):
+	with open(path,'rb') as in_file:
+		mapped = mmap.mmap(in_file.fileno(),0,access=mmap.ACCESS_READ)
+
+	magic,version,byteorder,cellsize,nstaff,ndays,ncodes = HEADER.unpack_from(mapped,0)
+	if magic != MAGIC or version != VERSION:
+		raise Exception(path + " is not a version " + str(VERSION) + " roster snapshot")
+	if cellsize != array(CELLTYPE).itemsize:
+		raise Exception(path + " has " + str(cellsize) + "-byte cells, expected " + str(array(CELLTYPE).itemsize))
+
+	offset = HEADER.size
+	names = []
+	for n in range(0,nstaff + ncodes):
+		length, = LENGTH.unpack_from(mapped,offset)
+		offset += LENGTH.size
+		names.append(mapped[offset:offset + length].decode('utf-8'))
+		offset += length
+	offset += -offset % 8
+
+	ordinalsize = array(ORDINALTYPE).itemsize
+	if len(mapped) < offset + ndays * ordinalsize + ndays * nstaff * cellsize:
+		raise Exception(path + " is truncated")
+
+	view = memoryview(mapped)
+	ordinals = view[offset:offset + ndays * ordinalsize].cast(ORDINALTYPE)
+	offset += ndays * ordinalsize
+	cells = view[offset:offset + ndays * nstaff * cellsize].cast(CELLTYPE)
+
+	if byteorder != BYTEORDER[sys.byteorder]:		#Written on another platform, swap into memory instead
+		ordinals = array(ORDINALTYPE,ordinals)
+		cells = array(CELLTYPE,cells)
+		ordinals.byteswap()
+		cells.byteswap()
+
+	return matrix.Matrix(names[:nstaff],names[nstaff:],ordinals,cells)
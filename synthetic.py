@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+
+import csv
+import datetime
+import random
+from xml.sax.saxutils import escape
+import zipfile
+
+import dates
+
+#########
+# GLOBALS
+#########
+SHIFTMIX = {'Off':40,		#Relative weight of each shift code in a generated roster
+	'Day':14,		#-- Roughly the mix of the example roster
+	'Night':10,
+	'Day8':8,
+	'D':6,
+	'Morning':5,
+	'Evening':5,
+	'Grave':4,
+	'Ann Lve':4,
+	'SS Off':2,
+	'sick':2}
+STARTDATE = datetime.date(2017,9,1)	#First date of a generated roster
+WORKSHEET = 'example_roster'		#Worksheet name used in generated workbooks
+XLSXPARTS = {'[Content_Types].xml':"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types"><Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/><Default Extension="xml" ContentType="application/xml"/><Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/><Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/><Override PartName="/xl/sharedStrings.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/></Types>""",
+	'_rels/.rels':"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships"><Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/></Relationships>""",
+	'xl/workbook.xml':"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets><sheet name="{worksheet}" sheetId="1" r:id="rId1"/></sheets></workbook>""",
+	'xl/_rels/workbook.xml.rels':"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships"><Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/><Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" Target="sharedStrings.xml"/></Relationships>"""}
+SHEETHEAD = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>"""
+SHEETTAIL = "</sheetData></worksheet>"
+STRINGSHEAD = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" count="{count}" uniqueCount="{count}">"""
+STRINGSTAIL = "</sst>"
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: generate
+# Returns a synthetic roster in the same layout as the downloaded worksheet
+# The same seed always gives the same roster
+#
+# Parameter(s):
+#	staff: Number of staff members (columns)
+#	-- Datatype: Integer
+#	days: Number of days (rows)
+#	-- Datatype: Integer
+#	mix: Optional. Relative weight of each shift code, as per SHIFTMIX
+#	-- Datatype: Dictionary of {'Shift':weight}
+#	start: Optional. First date of the roster
+#	-- Datatype: Python datetime.date Object
+#	seed: Optional. Seed of the random number generator
+#	-- Datatype: Integer
+# Returns:
+#	2-Dimensional Array, as per roster.Roster.__returnArray()
+#	- arr[0]: ['Date','Staff 1','Staff 2',...]
+#	- arr[n]: [Excel date serial,'Shift','Shift',...]
+#//////////////////////////////////////////////////////////////////
+def generate(staff,days,mix=None,start=STARTDATE,seed=0):
+	mix = SHIFTMIX if mix is None else mix
+	rng = random.Random(seed)
+	codes = list(mix)
+	weights = [mix[code] for code in codes]
+	first = start.toordinal() - dates.EXCELBASE
+	arr = [['Date'] + ["Staff " + str(n) for n in range(1,staff + 1)]]
+	for n in range(0,days):
+		arr.append([first + n] + rng.choices(codes,weights,k=staff))
+	return arr
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: mutate
+# Returns a copy of a synthetic roster with a share of its shifts changed
+# Used as the 'current' version of a roster when comparing two versions
+#
+# Parameter(s):
+#	arr: Roster returned from generate()
+#	-- Datatype: Array
+#	share: Fraction of the shifts to change, between 0 and 1
+#	-- Datatype: Float
+#	mix: Optional. Relative weight of each replacement shift code
+#	-- Datatype: Dictionary of {'Shift':weight}
+#	seed: Optional. Seed of the random number generator
+#	-- Datatype: Integer
+# Returns:
+#	2-Dimensional Array, as per generate()
+#//////////////////////////////////////////////////////////////////
+def mutate(arr,share,mix=None,seed=1):
+	mix = SHIFTMIX if mix is None else mix
+	rng = random.Random(seed)
+	codes = list(mix)
+	weights = [mix[code] for code in codes]
+	changed = [list(row) for row in arr]
+	cells = [(row,col) for row in range(1,len(arr)) for col in range(1,len(arr[0]))]
+	for row,col in rng.sample(cells,int(len(cells) * share)):
+		changed[row][col] = rng.choices(codes,weights)[0]
+	return changed
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: writeCSV
+# Writes a roster to a CSV file, as saved by processRoster._convert()
+#
+# Parameter(s):
+#	arr: Roster returned from generate()
+#	-- Datatype: Array
+#	csvfile: File location to write to
+#	-- Datatype: String
+#//////////////////////////////////////////////////////////////////
+def writeCSV(arr,csvfile):
+	with open(csvfile,'w',newline='') as new_csv:
+		csv.writer(new_csv).writerows(arr)
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: writeWorkbook
+# Writes a roster to a minimal Excel workbook with a single worksheet
+# Dates are written as numbers and shifts as shared strings, as Excel saves them
+# Rows are streamed into the archive, so large rosters are not held twice
+#
+# Parameter(s):
+#	arr: Roster returned from generate()
+#	-- Datatype: Array
+#	xlsxfile: File location to write to
+#	-- Datatype: String
+#	worksheet: Optional. Name of the worksheet
+#	-- Datatype: String
+#//////////////////////////////////////////////////////////////////
+def writeWorkbook(arr,xlsxfile,worksheet=WORKSHEET):
+	strings = {}
+	with zipfile.ZipFile(xlsxfile,'w',zipfile.ZIP_DEFLATED) as book:
+		for name,part in XLSXPARTS.items():
+			book.writestr(name,part.replace("{worksheet}",escape(worksheet,{'"':'&quot;'})))
+		with book.open('xl/worksheets/sheet1.xml','w') as sheet:
+			sheet.write(SHEETHEAD.encode('utf-8'))
+			for n in range(0,len(arr)):
+				sheet.write(_sheetRow(n + 1,arr[n],strings).encode('utf-8'))
+			sheet.write(SHEETTAIL.encode('utf-8'))
+		with book.open('xl/sharedStrings.xml','w') as shared:
+			shared.write(STRINGSHEAD.format(count=len(strings)).encode('utf-8'))
+			for string in strings:		#Dictionaries keep their insertion order
+				shared.write(("<si><t xml:space=\"preserve\">" + escape(string) + "</t></si>").encode('utf-8'))
+			shared.write(STRINGSTAIL.encode('utf-8'))
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: _sheetRow
+# Returns the worksheet XML of one row, adding new strings to the shared strings
+#
+# Parameter(s):
+#	number: Row number, starting at 1
+#	-- Datatype: Integer
+#	row: Values of the row
+#	-- Datatype: Array
+#	strings: Shared strings written so far, as {'String':index}
+#	-- Datatype: Dictionary
+# Returns:
+#	String
+#//////////////////////////////////////////////////////////////////
+def _sheetRow(number,row,strings):
+	cells = []
+	for col in range(0,len(row)):
+		value = row[col]
+		ref = _column(col) + str(number)
+		if isinstance(value,(int,float)):
+			cells.append("<c r=\"%s\"><v>%s</v></c>" % (ref,value))
+		elif value != '':
+			index = strings.setdefault(value,len(strings))
+			cells.append("<c r=\"%s\" t=\"s\"><v>%d</v></c>" % (ref,index))
+	return "<row r=\"%d\">%s</row>" % (number,"".join(cells))
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: _column
+# Returns the Excel column letters of a column index, e.g. 0 = 'A', 26 = 'AA'
+#//////////////////////////////////////////////////////////////////
+def _column(index):
+	letters = ""
+	index += 1
+	while index:
+		index,remainder = divmod(index - 1,26)
+		letters = chr(65 + remainder) + letters
+	return letters
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import roster
+
+#//////////////////////////////////////////////////////////////////
+# CLASS: AddMemberTest
+# Both storage engines must treat adding an existing staff member the same way
+#//////////////////////////////////////////////////////////////////
+class AddMemberTest(unittest.TestCase):
+	def setUp(self):
+		self.folder = tempfile.mkdtemp()
+		self.csvfile = os.path.join(self.folder,'roster.csv')
+		with open(self.csvfile,'w') as out_file:
+			out_file.write('"Date","Kevin","Pettles"\n')
+			out_file.write('"01/01/2020","Day","Night"\n')
+			out_file.write('"02/01/2020","Off","Night"\n')
+
+	def tearDown(self):
+		shutil.rmtree(self.folder)
+
+	def testDuplicateMember(self):
+		for storage in roster.STORAGE:
+			myroster = roster.Roster(self.csvfile,storage=storage)
+			myroster.headcount('01/01/2020')		#Builds the coverage index
+			with self.assertRaises(KeyError,msg=storage):
+				myroster.addMember('Kevin',default='Night')
+			self.assertEqual(myroster.showMember('Kevin'),roster.Roster(self.csvfile,storage=storage).showMember('Kevin'),storage)
+			self.assertEqual(myroster.onShift('01/01/2020','Day'),['Kevin'],storage)
+			self.assertEqual(myroster.onShift('01/01/2020','Night'),['Pettles'],storage)
+
+	def testNewMember(self):
+		for storage in roster.STORAGE:
+			myroster = roster.Roster(self.csvfile,storage=storage)
+			myroster.addMember('Alex',default='Day')
+			self.assertEqual(myroster.onShift('02/01/2020','Day'),['Alex'],storage)
+
+#//////////////////////////////////////////////////////////////////
+# CLASS: UnknownMemberTest
+# Both storage engines must raise KeyError for staff not in the roster
+#//////////////////////////////////////////////////////////////////
+class UnknownMemberTest(unittest.TestCase):
+	setUp = AddMemberTest.setUp
+	tearDown = AddMemberTest.tearDown
+
+	def testUnknownMember(self):
+		for storage in roster.STORAGE:
+			myroster = roster.Roster(self.csvfile,storage=storage)
+			output = io.StringIO()
+			with contextlib.redirect_stdout(output):
+				for call in [lambda: myroster.removeMember('Alex'),
+						lambda: myroster.showMember('Alex'),
+						lambda: myroster.showShift('01/01/2020','Alex')]:
+					with self.assertRaises(KeyError,msg=storage):
+						call()
+			self.assertEqual(output.getvalue(),'',storage)
+
+	def testRemoveMember(self):
+		for storage in roster.STORAGE:
+			myroster = roster.Roster(self.csvfile,storage=storage)
+			myroster.removeMember('Kevin')
+			self.assertEqual(myroster.query('01/01/2020','02/01/2020')['staff'],['Pettles'],storage)
+
+#//////////////////////////////////////////////////////////////////
+# CLASS: ShortRowTest
+# Cells missing from the end of a short row are blank in both storage engines
+#//////////////////////////////////////////////////////////////////
+class ShortRowTest(unittest.TestCase):
+	def setUp(self):
+		self.folder = tempfile.mkdtemp()
+		self.csvfile = os.path.join(self.folder,'ragged.csv')
+		with open(self.csvfile,'w') as out_file:
+			out_file.write('"Date","Kevin","Pettles","Barry"\n')
+			out_file.write('"01/01/2020","Day","Night","Off"\n')
+			out_file.write('"02/01/2020","Day"\n')
+			out_file.write('"03/01/2020","Off","Day","Night","Extra"\n')
+
+	def tearDown(self):
+		shutil.rmtree(self.folder)
+
+	def testShortRows(self):
+		results = {}
+		for storage in roster.STORAGE:
+			myroster = roster.Roster(self.csvfile,storage=storage)
+			results[storage] = [myroster.showMember('Pettles'),
+				myroster.showShift('02/01/2020','Barry'),
+				myroster.query('01/01/2020','03/01/2020'),
+				myroster.showHours('01/01/2020','03/01/2020'),
+				myroster.showCoverage('01/01/2020','03/01/2020')]
+		self.assertEqual(results['days'],results['matrix'])
+		self.assertEqual(results['days'][0],{'Pettles':{'01/01/2020':'Night','02/01/2020':'','03/01/2020':'Day'}})
+		self.assertEqual(results['days'][1],'')
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import roster
+import synthetic
+
+#//////////////////////////////////////////////////////////////////
+# CLASS: ExportTest
+# A roster written back out must match the CSV copy of the workbook it came from
+#//////////////////////////////////////////////////////////////////
+class ExportTest(unittest.TestCase):
+	def setUp(self):
+		self.folder = tempfile.mkdtemp()
+
+	def tearDown(self):
+		shutil.rmtree(self.folder)
+
+	def testMatchesConvertedCSV(self):
+		xlsxfile = os.path.join(self.folder,'roster.xlsx')
+		converted = os.path.join(self.folder,'converted.csv')
+		exported = os.path.join(self.folder,'exported.csv')
+		synthetic.writeWorkbook(synthetic.generate(5,30),xlsxfile,synthetic.WORKSHEET)
+		for storage in roster.STORAGE:
+			myroster = roster.Roster.fromWorkbook(xlsxfile,synthetic.WORKSHEET,converted,storage=storage)
+			with open(exported,'w') as out_file:
+				myroster.writeCSV(out_file)
+			with open(converted) as first, open(exported) as second:
+				self.assertEqual(first.read(),second.read(),storage)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import processRoster
+
+#//////////////////////////////////////////////////////////////////
+# CLASS: LoggingTest
+# Rosters of the same name in different folders must each log to their own folder
+#//////////////////////////////////////////////////////////////////
+class LoggingTest(unittest.TestCase):
+	def setUp(self):
+		self.folders = [tempfile.mkdtemp(),tempfile.mkdtemp()]
+		self.processors = []
+
+	def tearDown(self):
+		for processor in self.processors:
+			for handler in list(processor._log.handlers):
+				processor._log.removeHandler(handler)
+				handler.close()
+		for folder in self.folders:
+			shutil.rmtree(folder)
+
+	def testSameNameDifferentPaths(self):
+		self.processors = processors = [processRoster.Roster({'name':'logtest','path':folder + '/','user':'user','password':'password'})
+			for folder in self.folders]
+		for n,processor in enumerate(processors):
+			processor._log.info("Roster " + str(n))
+		for n,folder in enumerate(self.folders):
+			for handler in processors[n]._log.handlers:
+				handler.flush()
+			with open(os.path.join(folder,'log','logs.log')) as in_file:
+				lines = in_file.read().splitlines()
+			self.assertEqual(len(lines),1,folder)
+			self.assertTrue(lines[0].endswith("Roster " + str(n)),lines)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+
+import os
+import socketserver
+import sys
+import threading
+import unittest
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import notify
+
+#//////////////////////////////////////////////////////////////////
+# CLASS: SMTPHandler
+# Answers one connection to the SMTPStub with just enough SMTP for smtplib
+#//////////////////////////////////////////////////////////////////
+class SMTPHandler(socketserver.StreamRequestHandler):
+	def handle(self):
+		server = self.server
+		with server.lock:
+			server.connections += 1
+			server.open += 1
+			server.mostOpen = max(server.mostOpen,server.open)
+		try:
+			self.reply('220 stub')
+			while True:
+				line = self.rfile.readline()
+				if not line:
+					break
+				command = line.decode().strip().upper()
+				if command == 'DATA':
+					self.reply('354 End data with <CR><LF>.<CR><LF>')
+					lines = []
+					for line in iter(self.rfile.readline,b''):
+						if line == b'.\r\n':
+							break
+						lines.append(line.decode())
+					with server.lock:
+						server.messages.append(''.join(lines))
+					self.reply('250 Queued')
+				elif command == 'QUIT':
+					self.reply('221 Bye')
+					break
+				else:		#EHLO, MAIL FROM, RCPT TO, RSET, NOOP
+					self.reply('250 OK')
+		finally:
+			with server.lock:
+				server.open -= 1
+
+	def reply(self,line):
+		self.wfile.write((line + '\r\n').encode())
+
+#//////////////////////////////////////////////////////////////////
+# CLASS: SMTPStub
+# Local mail server counting the connections made and the messages received
+#//////////////////////////////////////////////////////////////////
+class SMTPStub(socketserver.ThreadingTCPServer):
+	daemon_threads = True
+
+	def __init__(self):
+		socketserver.ThreadingTCPServer.__init__(self,('127.0.0.1',0),SMTPHandler)
+		self.lock = threading.Lock()
+		self.connections = 0		#Connections made in total
+		self.open = 0
+		self.mostOpen = 0		#Connections open at once
+		self.messages = []
+
+	def address(self):
+		return '127.0.0.1:' + str(self.server_address[1])
+
+#//////////////////////////////////////////////////////////////////
+# CLASS: MailerTest
+# Every queued email must arrive, over no more than the pooled connections
+#//////////////////////////////////////////////////////////////////
+class MailerTest(unittest.TestCase):
+	def setUp(self):
+		self.server = SMTPStub()
+		threading.Thread(target=self.server.serve_forever,daemon=True).start()
+
+	def tearDown(self):
+		self.server.shutdown()
+		self.server.server_close()
+
+	def testSendAll(self):
+		for connections,workers in [(1,4),(notify.MAILCONNECTIONS,notify.MAILWORKERS),(3,8)]:
+			self.server.connections = 0
+			self.server.mostOpen = 0
+			self.server.messages = []
+			messages = [('staff' + str(n),'roster@example.com',['staff' + str(n) + '@example.com'],
+				'Subject: staff' + str(n) + '\r\n\r\nShift changed\r\n') for n in range(0,20)]
+			with notify.Mailer(self.server.address(),connections,workers) as mailer:
+				results = mailer.sendAll(messages)
+			self.assertEqual(results,dict((key,None) for key,sender,recipients,message in messages))
+			self.assertEqual(sorted(message.split('\r\n')[0] for message in self.server.messages),
+				sorted('Subject: ' + key for key,sender,recipients,message in messages))
+			self.assertGreaterEqual(self.server.connections,1)
+			self.assertLessEqual(self.server.connections,connections)
+			self.assertLessEqual(self.server.mostOpen,connections)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import checkStartup
+
+#//////////////////////////////////////////////////////////////////
+# CLASS: StartupTest
+# Importing processRoster must stay within IMPORTBUDGET without loading any
+# of the DEFERRED modules, as per checkStartup.py
+#//////////////////////////////////////////////////////////////////
+class StartupTest(unittest.TestCase):
+	def testProcessRoster(self):
+		self.assertEqual(checkStartup.checkStartup(),[])
+
+	def testDeferredImportReported(self):
+		failures = checkStartup.checkStartup('roster',budget=10 ** 9)
+		self.assertTrue(any(failure.endswith(" imported csv") for failure in failures),failures)
+
+if __name__ == '__main__':
+	unittest.main()
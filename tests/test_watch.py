@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import processRoster
+import roster
+import synthetic
+import watch
+
+#//////////////////////////////////////////////////////////////////
+# CLASS: FakeServer
+# Serves the current roster workbook in place of the requests module
+# Answers '304 Not Modified' when sent the ETag of the current workbook
+#//////////////////////////////////////////////////////////////////
+class FakeServer:
+	def __init__(self):
+		self.content = b''
+		self.requests = []
+
+	def publish(self,xlsxfile):
+		with open(xlsxfile,'rb') as in_file:
+			self.content = in_file.read()
+
+	def etag(self):
+		return '"' + hashlib.md5(self.content).hexdigest() + '"'
+
+	def get(self,url,auth=None,headers=None,verify=True,stream=False):
+		headers = headers or {}
+		self.requests.append(dict(headers))
+		if headers.get('If-None-Match') == self.etag():
+			return types.SimpleNamespace(status_code=304,headers={})
+		content = self.content
+		return types.SimpleNamespace(status_code=200,headers={'ETag':self.etag()},
+			iter_content=lambda chunk_size: (content[n:n + chunk_size] for n in range(0,len(content),chunk_size)))
+
+	def modules(self):
+		exceptions = types.ModuleType('requests.packages.urllib3.exceptions')
+		exceptions.InsecureRequestWarning = Warning
+		urllib3 = types.ModuleType('requests.packages.urllib3')
+		urllib3.exceptions = exceptions
+		urllib3.disable_warnings = lambda *args: None
+		packages = types.ModuleType('requests.packages')
+		packages.urllib3 = urllib3
+		requests = types.ModuleType('requests')
+		requests.packages = packages
+		requests.codes = types.SimpleNamespace(ok=200,not_modified=304)
+		requests.get = self.get
+		return {'requests':requests,'requests.packages':packages,
+			'requests.packages.urllib3':urllib3,'requests.packages.urllib3.exceptions':exceptions}
+
+#//////////////////////////////////////////////////////////////////
+# CLASS: WatchTest
+# A roster changed on the server later in the day must still be picked up
+#//////////////////////////////////////////////////////////////////
+class WatchTest(unittest.TestCase):
+	def setUp(self):
+		self.folder = tempfile.mkdtemp()
+		self.server = FakeServer()
+		self.first = synthetic.generate(5,30)
+		self.second = synthetic.mutate(self.first,0.5)
+		for name,arr in [('first',self.first),('second',self.second)]:
+			synthetic.writeWorkbook(arr,os.path.join(self.folder,name + '.xlsx'),synthetic.WORKSHEET)
+		self.processor = processRoster.Roster({'name':'watchtest','path':self.folder + '/','worksheet':synthetic.WORKSHEET,
+			'user':'user','password':'password','recips':{},'watch':True})
+
+	def tearDown(self):
+		shutil.rmtree(self.folder)
+
+	def testChangedSameDay(self):
+		checks = []
+		def process():
+			if len(checks) == 1:		#The roster is changed between the two checks
+				self.server.publish(os.path.join(self.folder,'second.xlsx'))
+			checks.append(self.processor.process())
+			return checks[-1]
+
+		self.server.publish(os.path.join(self.folder,'first.xlsx'))
+		with mock.patch.dict(sys.modules,self.server.modules()):
+			watch.Watcher(types.SimpleNamespace(process=process),interval=0).run(cycles=2)
+
+		self.assertEqual(checks,[True,True])
+		self.assertEqual(len(self.server.requests),2)
+		self.assertEqual(self.server.requests[1].get('If-None-Match'),'"' + hashlib.md5(open(os.path.join(self.folder,'first.xlsx'),'rb').read()).hexdigest() + '"')
+		with open(self.processor._xlsxfull,'rb') as in_file:
+			self.assertEqual(in_file.read(),self.server.content)
+		self.assertFalse(os.path.exists(self.processor._partfull))
+		converted = roster.Roster(self.processor._csvfull)
+		synthetic.writeCSV(self.second,os.path.join(self.folder,'second.csv'))
+		expected = roster.Roster(os.path.join(self.folder,'second.csv'))
+		self.assertEqual(converted.query('01/01/2018','31/12/2029'),expected.query('01/01/2018','31/12/2029'))
+
+	def testUnchangedSameDay(self):
+		self.server.publish(os.path.join(self.folder,'first.xlsx'))
+		with mock.patch.dict(sys.modules,self.server.modules()):
+			watch.Watcher(self.processor,interval=0).run(cycles=2)
+		self.assertEqual(len(self.server.requests),2)
+		self.assertTrue(self.processor._notModified)
+
+	def testCorruptThenGood(self):
+		corrupt = os.path.join(self.folder,'corrupt.xlsx')
+		with open(corrupt,'wb') as out_file:
+			out_file.write(b'Not a workbook')
+		results = []
+		with mock.patch.dict(sys.modules,self.server.modules()):
+			for name in ['first','corrupt','second']:
+				self.server.publish(os.path.join(self.folder,name + '.xlsx'))
+				results.append(self.processor.process())
+				with open(self.processor._xlsxfull,'rb') as in_file:
+					saved = in_file.read()
+				if name == 'corrupt':		#The first roster is kept, and is still the one to compare against
+					with open(os.path.join(self.folder,'first.xlsx'),'rb') as in_file:
+						self.assertEqual(saved,in_file.read())
+					self.assertEqual(self.processor._manifest.digest(self.processor._xlsxfull),hashlib.md5(saved).hexdigest())
+				else:
+					self.assertEqual(saved,self.server.content)
+				self.assertFalse(os.path.exists(self.processor._partfull))
+				self.assertFalse(os.path.exists(self.processor._csvfull + '.part'))
+
+		self.assertEqual(results,[True,False,True])
+		self.assertEqual(self.server.requests[2].get('If-None-Match'),self.server.requests[1].get('If-None-Match'))
+		converted = roster.Roster(self.processor._csvfull)
+		synthetic.writeCSV(self.second,os.path.join(self.folder,'second.csv'))
+		expected = roster.Roster(os.path.join(self.folder,'second.csv'))
+		self.assertEqual(converted.query('01/01/2018','31/12/2029'),expected.query('01/01/2018','31/12/2029'))
+
+if __name__ == '__main__':
+	unittest.main()
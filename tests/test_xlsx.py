@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import zipfile
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import synthetic
+import xlsx
+
+SHEET = ('<row r="1"><c r="A1" t="s"><v>0</v></c><c r="B1" t="s"><v>1</v></c><c r="C1" t="s"><v>2</v></c></row>'
+	'<row r="2"><c r="A2"><v>43101</v></c><c r="C2" t="s"><v>3</v></c></row>'
+	'<row r="4"><c r="A4"><v>43103</v></c><c r="B4" t="e"><v>#N/A</v></c><c r="C4" t="b"><v>1</v></c>'
+	'<c r="D4" t="inlineStr"><is><t>Extra</t></is></c></row>')
+STRINGS = ['Date','Kevin','Barry','Night']
+
+#//////////////////////////////////////////////////////////////////
+# CLASS: RowsTest
+# Checks the values read from a worksheet with ragged rows and an error cell
+#//////////////////////////////////////////////////////////////////
+class RowsTest(unittest.TestCase):
+	def setUp(self):
+		self.folder = tempfile.mkdtemp()
+		self.xlsxfile = os.path.join(self.folder,'ragged.xlsx')
+		with zipfile.ZipFile(self.xlsxfile,'w') as book:
+			for name,part in synthetic.XLSXPARTS.items():
+				book.writestr(name,part.replace("{worksheet}","ragged"))
+			book.writestr('xl/worksheets/sheet1.xml',synthetic.SHEETHEAD + SHEET + synthetic.SHEETTAIL)
+			book.writestr('xl/sharedStrings.xml',synthetic.STRINGSHEAD.format(count=len(STRINGS))
+				+ "".join("<si><t>" + string + "</t></si>" for string in STRINGS) + synthetic.STRINGSTAIL)
+
+	def tearDown(self):
+		shutil.rmtree(self.folder)
+
+	def testRaggedRows(self):
+		self.assertEqual(xlsx.sheetNames(self.xlsxfile),['ragged'])
+		self.assertEqual(list(xlsx.rows(self.xlsxfile,'ragged')),[
+			['Date','Kevin','Barry'],
+			[43101.0,'','Night'],		#Missing cells within a row are ''
+			['','',''],			#Missing rows are padded to the first row's width
+			[43103.0,'#N/A',1,'Extra']])	#Error cells are their text, and longer rows are kept whole
+
+	def testMissingWorksheet(self):
+		with self.assertRaises(Exception):
+			list(xlsx.rows(self.xlsxfile,'missing'))
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+
+import time
+
+#########
+# GLOBALS
+#########
+WATCHINTERVAL = 15 * 60		#Seconds between each check of the roster
+WATCHMAXBACKOFF = 4 * 60 * 60	#Longest wait between checks after repeated failures
+
+#//////////////////////////////////////////////////////////////////
+# CLASS: Watcher
+# Keeps a roster processor running, checking the roster on a schedule
+# The processor stays in memory between checks, so its last roster is kept hot
+# After a failed check the wait doubles, up to a maximum, until a check succeeds
+#
+# Parameter(s):
+#	processor: Object with a process() function returning True on success
+#		e.g. processRoster.Roster()
+#	-- Datatype: Object
+#	interval: Optional. Seconds between each check
+#	-- Datatype: Integer
+#	maxBackoff: Optional. Longest wait in seconds after repeated failures
+#	-- Datatype: Integer
+#//////////////////////////////////////////////////////////////////
+class Watcher:
+	def __init__(self,processor,interval=WATCHINTERVAL,maxBackoff=WATCHMAXBACKOFF):
+		self.__processor = processor
+		self.__interval = interval
+		self.__maxBackoff = max(interval,maxBackoff)
+		self.__failures = 0
+		self.__running = False
+
+#//////////////////////////////////////////////////////////////////
+# PUBLIC FUNCTIONS
+# Callable by program to start/stop watching
+#//////////////////////////////////////////////////////////////////
+	def run(self,cycles=None):
+		self.__run(cycles)
+
+	def stop(self):
+		self.__running = False
+
+	def failures(self):
+		return self.__failures
+
+#//////////////////////////////////////////////////////////////////
+# PRIVATE FUNCTIONS
+# Used by the Public functions to run the schedule
+#//////////////////////////////////////////////////////////////////
+	# FUNCTION: self.__run
+	# Checks the roster until stopped or the number of cycles is reached
+	#
+	# Parameter(s):
+	#	cycles: Number of checks to make, or None to run until stopped
+	#	-- Datatype: Integer
+	#//////////////////////////////////////////////////////////
+	def __run(self,cycles):
+		self.__running = True
+		count = 0
+		while self.__running and (cycles is None or count < cycles):
+			if self.__processor.process():
+				self.__failures = 0
+			else:
+				self.__failures += 1
+			count += 1
+			if self.__running and (cycles is None or count < cycles):
+				self.__wait(self.__delay())
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__delay
+	# Returns the seconds to wait before the next check
+	# Doubles the interval for each failure in a row, up to self.__maxBackoff
+	#//////////////////////////////////////////////////////////
+	def __delay(self):
+		if not self.__failures:
+			return self.__interval
+		return min(self.__interval * (2 ** self.__failures),self.__maxBackoff)
+
+	#//////////////////////////////////////////////////////////
+	# FUNCTION: self.__wait
+	# Sleeps in short steps, so that stop() takes effect promptly
+	#//////////////////////////////////////////////////////////
+	def __wait(self,seconds):
+		finish = time.time() + seconds
+		while self.__running and time.time() < finish:
+			time.sleep(min(1,finish - time.time()))
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+
+import posixpath
+import re
+import xml.etree.ElementTree as ElementTree
+import zipfile
+
+#########
+# GLOBALS
+#########
+WORKBOOKPART = 'xl/workbook.xml'
+RELATIONSHIPS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+STRICTRELATIONSHIPS = '{http://purl.oclc.org/ooxml/officeDocument/relationships}id'	#Strict Open XML workbooks
+CELLREF = re.compile(r'([A-Z]+)([0-9]+)')
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: sheetNames
+# Returns the names of the worksheets of a workbook, in workbook order
+#
+# Parameter(s):
+#	xlsxfile: File location of the workbook
+#	-- Datatype: String
+# Returns:
+#	Array of Strings
+#//////////////////////////////////////////////////////////////////
+def sheetNames(xlsxfile):
+	with zipfile.ZipFile(xlsxfile) as book:
+		return [name for name,part in _sheets(book)]
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: rows
+# Yields each row of one worksheet of a workbook, reading it straight from the
+# zipped XML as it goes. No other worksheet, and none of the formatting, is read,
+# and each row is discarded once yielded
+# Numbers are floats, text strings, booleans 1/0 and empty cells '', as per
+# xlrd's row_values(), except that:
+#	- Error cells are their text, e.g. '#N/A', rather than xlrd's error codes
+#	- Short rows are padded to the width of the first row rather than the
+#	  widest row, as the sheet is not read ahead. Longer rows are kept whole
+# Missing rows are yielded as empty rows of the first row's width
+#
+# Parameter(s):
+#	xlsxfile: File location of the workbook
+#	-- Datatype: String
+#	worksheet: Name of the worksheet to read
+#	-- Datatype: String
+# Yields:
+#	Array of each cell value in the row
+#//////////////////////////////////////////////////////////////////
+def rows(xlsxfile,worksheet):
+	with zipfile.ZipFile(xlsxfile) as book:
+		parts = dict(_sheets(book))
+		if worksheet not in parts:
+			raise Exception("Worksheet '" + worksheet + "' not found in " + xlsxfile)
+		strings = _sharedStrings(book)
+		with book.open(parts[worksheet]) as sheet:
+			for row in _rows(sheet,strings):
+				yield row
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: _sheets
+# Yields the name and zip part of each worksheet, via the workbook relationships
+#//////////////////////////////////////////////////////////////////
+def _sheets(book):
+	targets = {}
+	rels = posixpath.join(posixpath.dirname(WORKBOOKPART),'_rels',posixpath.basename(WORKBOOKPART) + '.rels')
+	for rel in ElementTree.fromstring(book.read(rels)):
+		target = rel.get('Target','')
+		if target.startswith('/'):
+			targets[rel.get('Id')] = target[1:]
+		else:
+			targets[rel.get('Id')] = posixpath.normpath(posixpath.join(posixpath.dirname(WORKBOOKPART),target))
+	for elem in ElementTree.fromstring(book.read(WORKBOOKPART)).iter():
+		if _tag(elem) == 'sheet':
+			rid = elem.get(RELATIONSHIPS) or elem.get(STRICTRELATIONSHIPS)
+			if rid in targets:
+				yield elem.get('name'),targets[rid]
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: _sharedStrings
+# Returns the shared string table of a workbook, read incrementally
+# Rich text is joined into one string, and phonetic hints are skipped
+#//////////////////////////////////////////////////////////////////
+def _sharedStrings(book):
+	strings = []
+	try:
+		part = book.open('xl/sharedStrings.xml')
+	except KeyError:		#Workbooks with no text have no shared strings
+		return strings
+	with part:
+		skip = 0
+		text = []
+		for event,elem in ElementTree.iterparse(part,events=('start','end')):
+			tag = _tag(elem)
+			if tag == 'rPh':
+				skip += 1 if event == 'start' else -1
+			elif event == 'end':
+				if tag == 't' and not skip:
+					text.append(elem.text or '')
+				elif tag == 'si':
+					strings.append(''.join(text))
+					text = []
+					elem.clear()
+	return strings
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: _rows
+# Yields the values of each row of a worksheet's XML
+#
+# Parameter(s):
+#	sheet: Open worksheet part of the workbook
+#	-- Datatype: File Object
+#	strings: Shared string table of the workbook
+#	-- Datatype: Array of Strings
+# Yields:
+#	Array of each cell value in the row, as per rows()
+#//////////////////////////////////////////////////////////////////
+def _rows(sheet,strings):
+	width = None
+	last = 0
+	data = None
+	for event,elem in ElementTree.iterparse(sheet,events=('start','end')):
+		if event == 'start':
+			if data is None and _tag(elem) == 'sheetData':
+				data = elem
+			continue
+		if _tag(elem) != 'row':
+			continue
+		number = int(elem.get('r',last + 1))
+		values = _cells(elem,strings)
+		data.clear()		#Discard the row once read
+		if width is None:
+			width = len(values)
+		while last + 1 < number:		#Rows with no cells are not written to the XML
+			last += 1
+			yield [''] * width
+		last = number
+		values.extend([''] * (width - len(values)))
+		yield values
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: _cells
+# Returns the values of a row element, placing each cell by its reference
+#//////////////////////////////////////////////////////////////////
+def _cells(row,strings):
+	values = []
+	for cell in row:
+		if _tag(cell) != 'c':
+			continue
+		ref = CELLREF.match(cell.get('r',''))
+		column = _column(ref.group(1)) if ref else len(values)
+		values.extend([''] * (column - len(values)))
+		values.append(_value(cell,strings))
+	return values
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: _value
+# Returns the value of a cell element, by its type
+#//////////////////////////////////////////////////////////////////
+def _value(cell,strings):
+	kind = cell.get('t','n')
+	value = None
+	for child in cell:
+		tag = _tag(child)
+		if tag == 'v':
+			value = child.text
+		elif tag == 'is':		#Inline string
+			return ''.join(t.text or '' for t in child.iter() if _tag(t) == 't')
+	if value is None:
+		return ''
+	if kind == 's':
+		return strings[int(value)]
+	if kind == 'n':
+		return float(value)
+	if kind == 'b':
+		return 1 if value == '1' else 0
+	return value		#'str' formula results, 'e' errors such as '#N/A' and 'd' ISO dates
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: _column
+# Returns the column index of Excel column letters, e.g. 'A' = 0, 'AA' = 26
+#//////////////////////////////////////////////////////////////////
+def _column(letters):
+	index = 0
+	for letter in letters:
+		index = index * 26 + ord(letter) - 64
+	return index - 1
+
+#//////////////////////////////////////////////////////////////////
+# FUNCTION: _tag
+# Returns the tag of an element without its namespace
+#//////////////////////////////////////////////////////////////////
+def _tag(elem):
+	return elem.tag.rsplit('}',1)[-1]